@@ -0,0 +1,102 @@
+"""Recall vs latency benchmark for the knowledge-base FAISS index types.
+
+Builds every index type from `src.agent.tools.faiss_index` over the same
+vectors and compares it with the exact flat index: recall@k against the flat
+results, per-query latency and serialised index size. IVF indexes are swept
+over `nprobe` and HNSW over `efSearch`.
+
+The default corpus is synthetic: unit-norm vectors drawn around random
+centres, with the same dimension as the FastEmbed model. Pass `--from-index`
+to use the vectors of the saved knowledge-base index instead (needs a flat
+index in FAISS_INDEX).
+
+Usage:
+    python benchmarks/faiss_index.py --vectors 50000 --queries 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.agent.tools.faiss_index import build_index, set_search_params  # noqa: E402
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, n)] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def saved_vectors() -> np.ndarray:
+    from src.agent.setting import settings
+
+    index = faiss.read_index(str(Path(settings.FAISS_INDEX) / "index.faiss"))
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def time_queries(index: faiss.Index, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Search one query at a time, as the retriever does, and return (ids, latencies)."""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids[i] = index.search(query[None, :], k)
+        latencies[i] = time.perf_counter() - start
+    return ids, latencies
+
+
+def recall(ids: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(ids, truth)]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=50000, help="synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="synthetic vector dimension")
+    parser.add_argument("--clusters", type=int, default=200, help="synthetic topic clusters")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5, help="neighbours per query, as in the retriever")
+    parser.add_argument("--from-index", action="store_true", help="use the saved knowledge-base vectors")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = saved_vectors() if args.from_index else synthetic_vectors(args.vectors, args.dim, args.clusters, rng)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)] + 0.05 * rng.normal(size=(args.queries, vectors.shape[1])).astype(np.float32)
+    print(f"{len(vectors)} vectors of dim {vectors.shape[1]}, {args.queries} queries, k={args.k}\n")
+
+    sweeps = {"flat": [None], "ivf_flat": [1, 4, 8, 16, 32], "ivf_pq": [1, 4, 8, 16, 32], "hnsw": [16, 32, 64, 128]}
+    truth = None
+
+    print(f"{'index':<9} {'param':<13} {'build s':>8} {'size MB':>8} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for index_type, params in sweeps.items():
+        start = time.perf_counter()
+        index = build_index(vectors, index_type=index_type)
+        index.add(vectors)
+        build = time.perf_counter() - start
+        size = len(faiss.serialize_index(index)) / 1e6
+
+        for param in params:
+            if index_type == "hnsw":
+                set_search_params(index, ef_search=param)
+                label = f"efSearch={param}"
+            elif param is not None:
+                set_search_params(index, nprobe=param)
+                label = f"nprobe={param}"
+            else:
+                label = "exact"
+
+            ids, latencies = time_queries(index, queries, args.k)
+            if truth is None:
+                truth = ids
+            print(f"{index_type:<9} {label:<13} {build:>8.2f} {size:>8.1f} {recall(ids, truth):>7.3f} {np.percentile(latencies, 50) * 1000:>8.3f} {np.percentile(latencies, 95) * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start benchmark for the agent graph.
+
+Measures how long `import src.agent.graph` takes in a fresh interpreter, and
+how long each lazily-initialised provider takes on first use. Before lazy
+initialisation every provider was created during the import, so the eager
+cold start was roughly the import time plus the sum of all provider times.
+
+Usage:
+    python benchmarks/import_time.py --runs 5 --warm-up
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import src.agent.graph; print(time.perf_counter() - t)"
+
+
+def measure_import(runs: int) -> list[float]:
+    """Import the graph in `runs` fresh interpreters and return the timings."""
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, capture_output=True, text=True, check=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def measure_providers() -> dict[str, float | str]:
+    """Initialise every provider one by one and return its time or error."""
+    sys.path.insert(0, str(ROOT))
+    import src.agent.graph  # noqa: F401
+    from src.agent.core.lazy import PROVIDERS
+
+    results: dict[str, float | str] = {}
+    for name, provider in PROVIDERS.items():
+        start = time.perf_counter()
+        try:
+            provider.get()
+            results[name] = time.perf_counter() - start
+        except Exception as e:
+            results[name] = f"failed: {e}"
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters to time")
+    parser.add_argument("--warm-up", action="store_true", help="also time each provider's first initialisation")
+    args = parser.parse_args()
+
+    timings = measure_import(args.runs)
+    import_median = statistics.median(timings)
+    print(f"import src.agent.graph: median {import_median:.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s ({args.runs} runs)")
+
+    if args.warm_up:
+        providers = measure_providers()
+        deferred = 0.0
+        for name, result in providers.items():
+            if isinstance(result, float):
+                deferred += result
+                print(f"  {name:<15} {result:.3f}s")
+            else:
+                print(f"  {name:<15} {result}")
+        print(f"deferred from import to first use: {deferred:.3f}s")
+        print(f"eager-equivalent cold start: {import_median + deferred:.3f}s vs lazy import {import_median:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""Offline load test for the agent graph.
+
+Drives the compiled `graph` from `src/agent/graph.py` with scripted
+conversations (FAQ, booking, reschedule, cancel) against local stand-ins:
+
+* a deterministic chat model that replays a script of tool calls and answers,
+* an in-memory Google Calendar (`events()` list/get/insert/patch/delete and batches),
+  or the local SQLite calendar backend with `--calendar sqlite`,
+* a capture SMTP server on localhost that accepts and counts the notification emails,
+* an in-memory long-term memory store and knowledge base.
+
+Booking, reschedule and cancel turns stop at the human review interrupt and
+are resumed with an "accept", as a reviewer would. The stand-ins can add a
+fixed latency per call to approximate Gemini, mem0 and Google round trips.
+
+Reports p50/p95 turn latency and turns/sec at each concurrency level (the
+number of conversations in flight), then the memory retained per
+conversation (checkpoints included), measured with tracemalloc.
+
+Usage:
+    python benchmarks/load_test.py --conversations 200 --concurrency 1,8,32
+    python benchmarks/load_test.py --llm-latency 800 --calendar-latency 150 --memory-latency 300
+"""
+
+import argparse
+import asyncio
+import gc
+import hashlib
+import itertools
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TMP_DIR = tempfile.TemporaryDirectory()
+
+# every backend is replaced below, so the credentials only have to pass validation
+for name in ["GOOGLE_API_KEY", "MEM0_API_KEY", "ACCOUNT_GMAIL", "PASSWORD_GMAIL", "CALENDAR_ID", "LANGSMITH_PROJECT", "LANGSMITH_API_KEY"]:
+    os.environ.setdefault(name, "load-test")
+os.environ.setdefault("SERVICE_ACCOUNT_FILE", "load-test.json")
+os.environ["LANGSMITH_TRACING_V2"] = "false"
+os.environ["OUTBOX_DB"] = str(Path(TMP_DIR.name) / "outbox.db")
+os.environ["SMTP_SERVER"] = "127.0.0.1"
+os.environ["WARM_UP_ON_START"] = "false"
+# no Google transport; the calendar itself is chosen with --calendar
+os.environ["CALENDAR_BACKEND"] = "sqlite"
+os.environ["CALENDAR_DB"] = str(Path(TMP_DIR.name) / "calendar.db")
+
+import httplib2  # noqa: E402
+from googleapiclient.errors import HttpError  # noqa: E402
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.types import Command  # noqa: E402
+from loguru import logger  # noqa: E402
+
+logger.remove()
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+# --- stand-ins -------------------------------------------------------------
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that replays `script[user message]`.
+
+    The n-th model call of a turn (counted from the last human message)
+    returns the n-th step: a list of tool calls, or the final answer text.
+    """
+
+    # typed Any so pydantic keeps the shared dict instead of copying it
+    script: Any
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        human = max(i for i, message in enumerate(messages) if isinstance(message, HumanMessage))
+        step = sum(1 for message in messages[human + 1 :] if isinstance(message, AIMessage))
+        steps = self.script[messages[human].content]
+        output = steps[min(step, len(steps) - 1)]
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        usage = {"input_tokens": prompt_tokens, "output_tokens": 40, "total_tokens": prompt_tokens + 40}
+        if isinstance(output, str):
+            return AIMessage(content=output, usage_metadata=usage)
+        calls = [{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"} for name, args in output]
+        return AIMessage(content="", tool_calls=calls, usage_metadata=usage)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+class FakeRequest:
+    """Stands in for `googleapiclient.http.HttpRequest`."""
+
+    def __init__(self, run: Callable[[], Any], latency: float):
+        self.run = run
+        self.latency = latency
+        self.headers: Dict[str, str] = {}
+
+    def execute(self, http: Any = None) -> Any:
+        time.sleep(self.latency)
+        return self.run()
+
+
+class FakeBatch:
+    def __init__(self, callback: Callable[[str, Any, Optional[Exception]], None], latency: float):
+        self.callback = callback
+        self.latency = latency
+        self.requests: List[tuple] = []
+
+    def add(self, request: FakeRequest, request_id: str) -> None:
+        self.requests.append((request_id, request))
+
+    def execute(self, http: Any = None) -> None:
+        # one round trip for the whole batch
+        time.sleep(self.latency)
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.run(), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+
+class InMemoryCalendar:
+    """The subset of the Calendar v3 `Resource` the tools use, backed by a dict."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _request(self, run: Callable[[], Any]) -> FakeRequest:
+        with self._lock:
+            self.calls += 1
+        return FakeRequest(run, self.latency)
+
+    @staticmethod
+    def _not_found(event_id: str) -> HttpError:
+        return HttpError(httplib2.Response({"status": 404}), f"event {event_id} not found".encode())
+
+    def events(self) -> "InMemoryCalendar":
+        return self
+
+    def new_batch_http_request(self, callback: Callable[[str, Any, Optional[Exception]], None]) -> FakeBatch:
+        return FakeBatch(callback, self.latency)
+
+    def insert(self, calendarId: str, body: Dict[str, Any]) -> FakeRequest:
+        def run() -> Dict[str, Any]:
+            event = {**body, "id": uuid.uuid4().hex, "etag": '"1"', "status": "confirmed"}
+            with self._lock:
+                self._events[event["id"]] = event
+            return dict(event)
+
+        return self._request(run)
+
+    def get(self, calendarId: str, eventId: str) -> FakeRequest:
+        def run() -> Dict[str, Any]:
+            with self._lock:
+                if eventId not in self._events:
+                    raise self._not_found(eventId)
+                return dict(self._events[eventId])
+
+        return self._request(run)
+
+    def patch(self, calendarId: str, eventId: str, body: Dict[str, Any]) -> FakeRequest:
+        def run() -> Dict[str, Any]:
+            with self._lock:
+                if eventId not in self._events:
+                    raise self._not_found(eventId)
+                event = self._events[eventId]
+                event.update(body)
+                event["etag"] = f'"{int(event["etag"].strip(chr(34))) + 1}"'
+                return dict(event)
+
+        return self._request(run)
+
+    def delete(self, calendarId: str, eventId: str) -> FakeRequest:
+        def run() -> str:
+            with self._lock:
+                if self._events.pop(eventId, None) is None:
+                    raise self._not_found(eventId)
+            return ""
+
+        return self._request(run)
+
+    def list(self, calendarId: str, timeMin: str, timeMax: str, maxResults: int = 250, **kwargs: Any) -> FakeRequest:
+        def run() -> Dict[str, Any]:
+            lo, hi = datetime.fromisoformat(timeMin), datetime.fromisoformat(timeMax)
+            with self._lock:
+                events = [dict(event) for event in self._events.values() if datetime.fromisoformat(event["start"]["dateTime"]) < hi and datetime.fromisoformat(event["end"]["dateTime"]) > lo]
+            events.sort(key=lambda event: event["start"]["dateTime"])
+            return {"items": events[:maxResults]}
+
+        return self._request(run)
+
+
+class CaptureSMTPServer:
+    """Minimal SMTP server on localhost that accepts every message and counts it."""
+
+    def __init__(self):
+        self.messages = 0
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        threading.Thread(target=self.loop.run_forever, name="capture-smtp", daemon=True).start()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"220 capture ESMTP\r\n")
+        in_data = False
+        while line := await reader.readline():
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.messages += 1
+                    writer.write(b"250 queued\r\n")
+                continue
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250-capture\r\n250 AUTH PLAIN LOGIN\r\n")
+            elif command.startswith("AUTH"):
+                writer.write(b"235 authenticated\r\n")
+            elif command.startswith("DATA"):
+                in_data = True
+                writer.write(b"354 end with .\r\n")
+            elif command.startswith("QUIT"):
+                writer.write(b"221 bye\r\n")
+                break
+            else:
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
+
+
+class InMemoryKnowledgeBase:
+    """Stands in for `VectorStoreRetriever` in `knowledge_base_tool`."""
+
+    generation = 1
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.docs = [
+            Document(page_content="Klinik Sehat Bersama buka Senin, Rabu, Jumat 16:00-20:00 dan Sabtu 08:00-12:00 WIB."),
+            Document(page_content="Alamat: Jl. Merdeka No. 123, Jakarta Pusat. Parkir tersedia di basement."),
+            Document(page_content="Layanan: konsultasi umum, medical check-up, vaksinasi, dan pemeriksaan laboratorium dasar."),
+        ]
+
+    def search(self, query: str, k: int = 5) -> List[Document]:
+        time.sleep(self.latency)
+        return self.docs[:k]
+
+    def embed_query(self, query: str) -> List[float]:
+        digest = hashlib.sha256(query.encode()).digest()
+        return [byte / 255 for byte in digest]
+
+
+# --- scripted conversations --------------------------------------------------
+
+
+def next_practice_day(weekday: int, hour: int) -> datetime:
+    """Next date on `weekday` (0 = Monday) at `hour`, at least one day ahead."""
+    day = datetime.now() + timedelta(days=1)
+    while day.weekday() != weekday:
+        day += timedelta(days=1)
+    return day.replace(hour=hour, minute=0, second=0, microsecond=0)
+
+
+def seed_event(calendar: Any, patient: str, start: datetime) -> str:
+    body = {
+        "summary": f"[Consultation] {patient}",
+        "description": f"Patient Name: {patient}\nPatient Email: {patient.lower()}@example.com",
+        "start": {"dateTime": f"{start.isoformat()}+07:00", "timeZone": "Asia/Jakarta"},
+        "end": {"dateTime": f"{(start + timedelta(minutes=30)).isoformat()}+07:00", "timeZone": "Asia/Jakarta"},
+    }
+    return calendar.insert(os.environ["CALENDAR_ID"], body).execute()["id"]
+
+
+def build_conversation(kind: str, n: int, calendar: Any, script: Dict[str, List[Any]]) -> List[str]:
+    """Add the script of conversation `n` and return its user messages."""
+    patient = f"Pasien{n}"
+    email = f"pasien{n}@example.com"
+    monday = next_practice_day(0, 16) + timedelta(minutes=30 * (n % 8))
+    turns: List[tuple] = []
+
+    if kind == "faq":
+        turns.append((f"[{n}] Jam berapa klinik buka?", [[("knowledge_base_tool", {"query": "jam buka klinik"})], "Klinik buka Senin, Rabu, Jumat 16:00-20:00 dan Sabtu 08:00-12:00 WIB."]))
+        turns.append((f"[{n}] Alamatnya di mana?", [[("knowledge_base_tool", {"query": "alamat klinik"})], "Jl. Merdeka No. 123, Jakarta Pusat."]))
+    elif kind == "booking":
+        week = {"start_date": monday.date().isoformat(), "end_date": (monday + timedelta(days=6)).date().isoformat()}
+        turns.append((f"[{n}] Ada jadwal kosong minggu depan?", [[("get_available_slots", week)], "Senin pukul 16:00 masih kosong."]))
+        create = {"patient_name": patient, "patient_email": email, "appointment_datetime": monday.isoformat(), "symptoms": "demam"}
+        turns.append((f"[{n}] Tolong booking Senin jam 16:00 atas nama {patient}", [[("create_doctor_appointment", create)], "Janji temu sudah dibuat, email konfirmasi akan dikirim."]))
+    elif kind == "reschedule":
+        event_id = seed_event(calendar, patient, monday)
+        window = {"start_datetime": (monday - timedelta(hours=1)).isoformat(), "end_datetime": (monday + timedelta(hours=4)).isoformat()}
+        turns.append((f"[{n}] Jadwal saya Senin jam berapa ya?", [[("get_doctor_schedule_appointments", window)], "Jadwal Anda Senin sore."]))
+        new_start = monday + timedelta(days=2)
+        update = {"event_id": event_id, "patient_name": patient, "patient_email": email, "start_datetime": new_start.isoformat()}
+        turns.append((f"[{n}] Pindahkan ke Rabu di jam yang sama", [[("update_doctor_appointment", update)], "Jadwal sudah dipindah ke hari Rabu."]))
+    elif kind == "cancel":
+        event_id = seed_event(calendar, patient, monday)
+        cancel = {"event_id": event_id, "reason": "berhalangan", "patient_name": patient, "patient_email": email, "appointment_datetime": monday.isoformat(), "appointment_type": "Consultation"}
+        turns.append((f"[{n}] Detail janji saya {event_id}?", [[("get_event_by_id", {"event_id": event_id})], "Janji Anda hari Senin sore."]))
+        turns.append((f"[{n}] Tolong batalkan saja", [[("cancel_doctor_appointment", cancel)], "Janji temu sudah dibatalkan."]))
+
+    for message, steps in turns:
+        script[message] = steps
+    return [message for message, _ in turns]
+
+
+# --- driver ------------------------------------------------------------------
+
+
+async def run_conversation(graph: Any, context: Any, messages: List[str], latencies: List[float]) -> None:
+    config = {"configurable": {"thread_id": uuid.uuid4().hex}}
+    for message in messages:
+        start = time.perf_counter()
+        result = await graph.ainvoke({"messages": [("user", message)]}, config, context=context)
+        while result.get("__interrupt__"):
+            result = await graph.ainvoke(Command(resume=[{"type": "accept"}]), config, context=context)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(graph: Any, context: Any, conversations: List[List[str]], concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def limited(messages: List[str]) -> None:
+        async with semaphore:
+            await run_conversation(graph, context, messages, latencies)
+
+    await asyncio.gather(*(limited(messages) for messages in conversations))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200, help="conversations per concurrency level, mixed FAQ/booking/reschedule/cancel")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated numbers of conversations in flight")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="ms added to every chat model call")
+    parser.add_argument("--calendar", choices=["memory", "sqlite"], default="memory", help="in-memory Calendar stand-in, or the SQLite calendar backend")
+    parser.add_argument("--calendar-latency", type=float, default=0.0, help="ms added to every Calendar API request (memory calendar only)")
+    parser.add_argument("--memory-latency", type=float, default=0.0, help="ms added to every memory search and write")
+    parser.add_argument("--kb-latency", type=float, default=0.0, help="ms added to every knowledge-base search")
+    parser.add_argument("--memory-conversations", type=int, default=50, help="conversations for the tracemalloc pass, 0 skips it")
+    args = parser.parse_args()
+
+    smtp = CaptureSMTPServer()
+    os.environ["SMTP_PORT"] = str(smtp.port)
+
+    from src.agent import utils
+    from src.agent.context import Context
+    from src.agent.core import CALENDAR_PROVIDER, METRICS
+    from src.agent.core.metrics import TOOL_CALLS, TOOL_LATENCY
+    from src.agent.graph import graph
+    from src.agent.memory import MEMORY_BACKEND_PROVIDER, MEMORY_WRITER, MemoryBackend
+    from src.agent.tools import TOOLS_CALENDAR, TOOLS_KNOWLEDGE_BASE
+    from src.agent.tools.tool_retriever import VECTOR_STORE_PROVIDER
+
+    class InMemoryMemoryBackend(MemoryBackend):
+        """Keeps the user messages of every conversation, newest last."""
+
+        def __init__(self, latency: float):
+            self.latency = latency
+            self.memories: Dict[str, List[str]] = {}
+
+        async def search(self, query: str, user_id: str, top_k: int = 10) -> List[str]:
+            await asyncio.sleep(self.latency)
+            return self.memories.get(user_id, [])[-top_k:]
+
+        async def add(self, conversation: List[Dict], user_id: str, metadata: Optional[dict] = None) -> None:
+            await asyncio.sleep(self.latency)
+            self.memories.setdefault(user_id, []).extend(message["content"] for message in conversation if message["role"] == "user")
+
+    # the graph adds the file log sink on first use; keep logging off instead of writing ./logger.log
+    utils.LOG_SINK_PROVIDER.override(None)
+    script: Dict[str, List[Any]] = {}
+    if args.calendar == "memory":
+        CALENDAR_PROVIDER.override(InMemoryCalendar(latency=args.calendar_latency / 1000))
+    calendar = CALENDAR_PROVIDER.get()
+    utils.load_chat_model = lambda name: ScriptedChatModel(script=script, latency=args.llm_latency / 1000)
+    MEMORY_BACKEND_PROVIDER.override(InMemoryMemoryBackend(latency=args.memory_latency / 1000))
+    VECTOR_STORE_PROVIDER.override(InMemoryKnowledgeBase(latency=args.kb_latency / 1000))
+
+    checkpointed = graph.copy(update={"checkpointer": InMemorySaver()})
+    context = Context(model="scripted/load-test")
+    kinds = itertools.cycle(["faq", "booking", "reschedule", "cancel"])
+    counter = itertools.count()
+
+    def conversations(n: int) -> List[List[str]]:
+        return [build_conversation(next(kinds), next(counter), calendar, script) for _ in range(n)]
+
+    async def run() -> None:
+        print(f"{args.conversations} conversations per level (FAQ, booking, reschedule, cancel), 2 turns each\n")
+        print(f"{'concurrency':>11} {'turns':>6} {'p50 ms':>8} {'p95 ms':>8} {'turns/s':>8}")
+        # one untimed conversation of each kind builds the bound model and warms the caches
+        await run_load(checkpointed, context, conversations(4), 4)
+        for concurrency in [int(level) for level in args.concurrency.split(",")]:
+            batch = conversations(args.conversations)
+            start = time.perf_counter()
+            latencies = await run_load(checkpointed, context, batch, concurrency)
+            elapsed = time.perf_counter() - start
+            ms = [latency * 1000 for latency in latencies]
+            print(f"{concurrency:>11} {len(ms):>6} {percentile(ms, 50):>8.1f} {percentile(ms, 95):>8.1f} {len(ms) / elapsed:>8.1f}")
+
+        if args.memory_conversations:
+            batch = conversations(args.memory_conversations)
+            gc.collect()
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            await run_load(checkpointed, context, batch, 8)
+            gc.collect()
+            growth = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+            tracemalloc.stop()
+            print(f"\nmemory retained per conversation: {growth / args.memory_conversations / 1024:.1f} KiB (checkpoints, memory store, calendar)")
+
+        await MEMORY_WRITER.drain(timeout=30)
+
+    asyncio.run(run())
+
+    # wait for the outbox worker to deliver the queued notifications
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        with closing(sqlite3.connect(os.environ["OUTBOX_DB"])) as conn:
+            if not conn.execute("SELECT COUNT(*) FROM outbox WHERE status IN ('pending', 'sending')").fetchone()[0]:
+                break
+        time.sleep(0.1)
+    if isinstance(calendar, InMemoryCalendar):
+        print(f"calendar requests: {calendar.calls}")
+    print(f"emails captured: {smtp.messages}")
+
+    print(f"\n{'tool':<34} {'calls':>6} {'errors':>6} {'mean ms':>8} {'p95 ms':>8}")
+    for tool in sorted(tool.name for tool in TOOLS_KNOWLEDGE_BASE + TOOLS_CALENDAR):
+        calls = TOOL_LATENCY.count(tool=tool)
+        if calls:
+            errors = TOOL_CALLS.value(tool=tool, status="error") + TOOL_CALLS.value(tool=tool, status="timeout")
+            mean = METRICS.snapshot()["agent_tool_latency_seconds"][f'{{tool="{tool}"}}']["avg"]
+            print(f"{tool:<34} {calls:>6} {errors:>6.0f} {mean * 1000:>8.2f} {TOOL_LATENCY.quantile(0.95, tool=tool) * 1000:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
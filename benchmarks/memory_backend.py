@@ -0,0 +1,78 @@
+"""Latency benchmark for the local memory backend.
+
+Seeds a throwaway SQLite database with `--memories` memories for one user,
+then times `--queries` searches. Retrieval (the similarity search over the
+user's memories) and query embedding are reported separately, since only
+retrieval grows with the number of memories.
+
+Usage:
+    python benchmarks/memory_backend.py --memories 1000 --queries 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.agent.memory.backend import LocalMemoryBackend  # noqa: E402
+
+TOPICS = ["dentist", "pediatrician", "morning appointments", "allergy to penicillin", "lives in Jakarta", "prefers email", "diabetes check-up", "weekend availability"]
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def report(name: str, timings: list[float]) -> None:
+    ms = [t * 1000 for t in timings]
+    print(f"  {name:<12} p50 {percentile(ms, 50):.3f} ms, p95 {percentile(ms, 95):.3f} ms, mean {statistics.mean(ms):.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=1000, help="memories stored for the benchmark user")
+    parser.add_argument("--queries", type=int, default=200, help="number of searches to time")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = LocalMemoryBackend(str(Path(tmp) / "memory.db"))
+
+        texts = [f"Patient note {i}: {TOPICS[i % len(TOPICS)]}" for i in range(args.memories)]
+        start = time.perf_counter()
+        backend.add_sync(texts, user_id="bench")
+        print(f"stored {args.memories} memories in {time.perf_counter() - start:.2f}s")
+
+        queries = [f"does the patient have {TOPICS[i % len(TOPICS)]}?" for i in range(args.queries)]
+        vectors = backend.embeddings.embed_documents(queries)
+
+        retrieval = []
+        for vector in vectors:
+            start = time.perf_counter()
+            backend.search_sync(vector, user_id="bench", top_k=args.top_k)
+            retrieval.append(time.perf_counter() - start)
+
+        async def run_searches() -> list[float]:
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                await backend.search(query, user_id="bench", top_k=args.top_k)
+                timings.append(time.perf_counter() - start)
+            return timings
+
+        end_to_end = asyncio.run(run_searches())
+
+    print(f"search over {args.memories} memories, top {args.top_k} ({args.queries} queries):")
+    report("retrieval", retrieval)
+    report("end-to-end", end_to_end)
+
+
+if __name__ == "__main__":
+    main()
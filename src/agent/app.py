@@ -0,0 +1,30 @@
+"""Custom HTTP app mounted by the LangGraph server.
+
+Used for process lifecycle hooks: on shutdown, queued memory writes are
+flushed before the worker exits. Also serves the in-process metrics at
+`/metrics` in the Prometheus text format.
+"""
+
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.agent.core import METRICS
+from src.agent.memory import MEMORY_WRITER
+from src.agent.setting import settings
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    yield
+    await MEMORY_WRITER.shutdown(timeout=settings.MEMORY_WRITE_DRAIN_TIMEOUT)
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+app = Starlette(routes=[Route("/metrics", metrics)], lifespan=lifespan)
@@ -0,0 +1,138 @@
+"""Token-budgeted assembly of the messages sent to the model."""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+
+from src.agent.core import METRICS
+from src.agent.setting import settings
+from src.agent.utils import get_message_text
+
+
+class ContextMetrics:
+    """Counters of how much prompt the context stage removed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {
+            "calls": 0,
+            "tokens_before": 0,
+            "tokens_after": 0,
+            "messages_dropped": 0,
+            "tool_messages_compacted": 0,
+        }
+
+    def record(self, tokens_before: int, tokens_after: int, dropped: int, compacted: int) -> None:
+        with self._lock:
+            self._counters["calls"] += 1
+            self._counters["tokens_before"] += tokens_before
+            self._counters["tokens_after"] += tokens_after
+            self._counters["messages_dropped"] += dropped
+            self._counters["tool_messages_compacted"] += compacted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "tokens_saved": self._counters["tokens_before"] - self._counters["tokens_after"]}
+
+
+CONTEXT_METRICS = ContextMetrics()
+METRICS.register_collector("context", CONTEXT_METRICS.stats)
+
+
+@dataclass
+class PreparedContext:
+    """Messages to send, plus what was removed to fit the budget."""
+
+    messages: List[BaseMessage]
+    earlier_questions: List[str]
+    tokens_before: int
+    tokens_after: int
+
+
+def token_budget(model: str) -> int:
+    """Return the prompt token budget for `model`: its entry in CONTEXT_TOKEN_BUDGETS or the default."""
+    return settings.CONTEXT_TOKEN_BUDGETS.get(model, settings.CONTEXT_TOKEN_BUDGET)
+
+
+def clip_memory_context(context: str, max_tokens: int) -> str:
+    """Keep the leading memory lines (most relevant first) that fit in `max_tokens`."""
+    lines, used = [], 0
+    for line in context.splitlines():
+        tokens = count_tokens_approximately([HumanMessage(line)], extra_tokens_per_message=0)
+        if lines and used + tokens > max_tokens:
+            break
+        lines.append(line)
+        used += tokens
+    return "\n".join(lines)
+
+
+def compact_tool_messages(messages: Sequence[BaseMessage], max_chars: int) -> List[BaseMessage]:
+    """
+    Shorten tool results from earlier turns.
+
+    The model already answered from those results, so only their beginning
+    is kept. Tool results of the current turn (after the last human message)
+    are left intact.
+    """
+    last_human = max((i for i, message in enumerate(messages) if isinstance(message, HumanMessage)), default=-1)
+    compacted = []
+    for i, message in enumerate(messages):
+        if i < last_human and isinstance(message, ToolMessage):
+            text = get_message_text(message)
+            if len(text) > max_chars:
+                message = message.model_copy(update={"content": f"{text[:max_chars]}... [{len(text) - max_chars} chars omitted]"})
+        compacted.append(message)
+    return compacted
+
+
+def prepare_context(messages: Sequence[BaseMessage], system_tokens: int, budget: int) -> PreparedContext:
+    """
+    Fit the conversation into `budget` tokens alongside the system prompt.
+
+    Stale tool results are compacted first. If the history is still too long,
+    the oldest turns are dropped whole (the kept history always starts at a
+    human message, so tool calls stay paired with their results). The current
+    turn is always kept. The questions of the dropped turns are returned so
+    they can be mentioned in the system prompt.
+
+    Args:
+        messages: Conversation history from the graph state.
+        system_tokens: Tokens used by the system prompt.
+        budget: Maximum prompt tokens for system prompt plus history.
+
+    Returns:
+        PreparedContext: The messages to send and the token counts.
+    """
+    tokens_before = count_tokens_approximately(messages)
+    compacted = compact_tool_messages(messages, settings.CONTEXT_TOOL_RESULT_MAX_CHARS)
+    n_compacted = sum(1 for old, new in zip(messages, compacted) if old is not new)
+
+    kept = compacted
+    if count_tokens_approximately(compacted) > budget - system_tokens:
+        kept = trim_messages(
+            compacted,
+            max_tokens=max(budget - system_tokens, 0),
+            token_counter=count_tokens_approximately,
+            strategy="last",
+            start_on="human",
+            allow_partial=False,
+        )
+        # never drop the turn being answered
+        last_human = max((i for i, message in enumerate(compacted) if isinstance(message, HumanMessage)), default=0)
+        if len(kept) < len(compacted) - last_human:
+            kept = compacted[last_human:]
+
+    dropped = compacted[: len(compacted) - len(kept)]
+    earlier_questions = [get_message_text(message) for message in dropped if isinstance(message, HumanMessage)]
+    tokens_after = count_tokens_approximately(kept)
+    CONTEXT_METRICS.record(tokens_before, tokens_after, len(dropped), n_compacted)
+    return PreparedContext(list(kept), earlier_questions, tokens_before, tokens_after)
+
+
+def summarize_earlier_questions(questions: Sequence[str], max_items: int = 5, max_chars: int = 120) -> str:
+    """One line per recent dropped question, for the system prompt."""
+    lines = [f"- {question[:max_chars]}" for question in questions[-max_items:]]
+    return "\n".join(lines)
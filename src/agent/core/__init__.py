@@ -1,4 +1,21 @@
-from .calendar_service import CALENDAR_SERVICE
-from .email_service import EMAIL_SERVICE
+from .calendar_cache import EVENT_CACHE
+from .calendar_service import CALENDAR_PROVIDER, execute_batch, execute_request, get_calendar_service, run_in_calendar_executor
+from .calendar_sqlite import SQLiteCalendar
+from .email_service import EMAIL_PROVIDER, get_email_service
+from .lazy import Lazy, warm_up
+from .metrics import METRICS
 
-__all__ = ["CALENDAR_SERVICE", "EMAIL_SERVICE"]
+__all__ = [
+    "CALENDAR_PROVIDER",
+    "EMAIL_PROVIDER",
+    "EVENT_CACHE",
+    "Lazy",
+    "METRICS",
+    "SQLiteCalendar",
+    "execute_batch",
+    "execute_request",
+    "get_calendar_service",
+    "get_email_service",
+    "run_in_calendar_executor",
+    "warm_up",
+]
@@ -0,0 +1,176 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from loguru import logger
+
+from src.agent.setting import settings
+
+from .metrics import METRICS
+
+CALENDAR_TIMEZONE = pytz.timezone("Asia/Jakarta")
+
+
+def event_bounds(event: Dict) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Return the timezone-aware (start, end) of a raw Calendar event."""
+    start = event.get("start", {})
+    end = event.get("end", {})
+
+    if "dateTime" in start:
+        return (
+            datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00")),
+            datetime.fromisoformat(end["dateTime"].replace("Z", "+00:00")),
+        )
+    if "date" in start:
+        # all-day events are anchored to the calendar's timezone
+        return (
+            CALENDAR_TIMEZONE.localize(datetime.fromisoformat(start["date"])),
+            CALENDAR_TIMEZONE.localize(datetime.fromisoformat(end["date"])),
+        )
+    return None, None
+
+
+@dataclass
+class CachedWindow:
+    """Events returned by one `events().list` call for [time_min, time_max)."""
+
+    time_min: datetime
+    time_max: datetime
+    events: List[Dict]
+    complete: bool
+    fetched_at: float
+
+    def covers(self, time_min: datetime, time_max: datetime) -> bool:
+        return self.time_min <= time_min and time_max <= self.time_max
+
+
+class CalendarEventCache:
+    """
+    In-process interval cache of Calendar events.
+
+    Each `events().list` result is stored with the window it was fetched for.
+    A later lookup is answered locally when a fresh window covers the
+    requested range, by filtering that window's events, so overlapping and
+    repeated availability queries cost no API quota.
+
+    Windows expire after `ttl` seconds, which bounds staleness for writes made
+    outside this process. Writes made through the tools call `invalidate`.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_windows: int = 128):
+        self.ttl = ttl
+        self.max_windows = max_windows
+        self.hits = 0
+        self.misses = 0
+        # bumped on every invalidation, so a fetch that raced with a write is not cached
+        self.generation = 0
+
+        self._windows: List[CachedWindow] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, time_min: datetime, time_max: datetime, max_results: int) -> Optional[List[Dict]]:
+        """
+        Look up events overlapping [time_min, time_max), ordered by start time.
+
+        Returns:
+            The cached events, or None on a cache miss.
+        """
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            self._windows = [w for w in self._windows if now - w.fetched_at < self.ttl]
+            for window in reversed(self._windows):
+                if not window.covers(time_min, time_max):
+                    continue
+                # a truncated result can only answer the exact same query
+                if not window.complete and (window.time_min, window.time_max) != (time_min, time_max):
+                    continue
+
+                events = []
+                for event in window.events:
+                    start, end = event_bounds(event)
+                    if start is not None and end > time_min and start < time_max:
+                        events.append(event)
+                if window.complete or len(events) >= max_results:
+                    self.hits += 1
+                    return events[:max_results]
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        time_min: datetime,
+        time_max: datetime,
+        events: List[Dict],
+        complete: bool,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Store the result of an `events().list` call.
+
+        Args:
+            time_min: Start of the fetched window.
+            time_max: End of the fetched window.
+            events: Raw events returned by the API.
+            complete: False if the result was truncated by `maxResults`.
+            generation: Value of `generation` read before the fetch; the result
+                is discarded if a write invalidated the cache meanwhile.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._windows.append(CachedWindow(time_min, time_max, list(events), complete, time.monotonic()))
+            if len(self._windows) > self.max_windows:
+                self._windows.pop(0)
+
+    def invalidate(
+        self,
+        event_id: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> None:
+        """
+        Drop windows affected by a write.
+
+        Args:
+            event_id: Drop windows that contain this event.
+            start: Start of the written interval; with `end`, drop windows overlapping it.
+            end: End of the written interval.
+        """
+        with self._lock:
+            self.generation += 1
+            before = len(self._windows)
+            self._windows = [
+                w for w in self._windows if not ((event_id is not None and any(e.get("id") == event_id for e in w.events)) or (start is not None and end is not None and w.time_min < end and start < w.time_max))
+            ]
+            dropped = before - len(self._windows)
+        if dropped:
+            logger.debug(f"Invalidated {dropped} cached calendar window(s)")
+
+    def clear(self) -> None:
+        """Drop every cached window."""
+        with self._lock:
+            self.generation += 1
+            self._windows = []
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of cached windows."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "windows": len(self._windows)}
+
+
+EVENT_CACHE: CalendarEventCache = CalendarEventCache(ttl=settings.CALENDAR_CACHE_TTL)
+METRICS.register_collector("calendar_cache", EVENT_CACHE.stats)
@@ -1,11 +1,24 @@
-from typing import Optional
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
+import httplib2
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import Resource, build
+from googleapiclient.http import HttpRequest
 from loguru import logger
 
 from src.agent.setting import settings
 
+from .calendar_sqlite import LocalRequest, SQLiteCalendar
+from .lazy import Lazy
+
+T = TypeVar("T")
+
 
 class GoogleCalendarService:
     """
@@ -17,6 +30,9 @@ class GoogleCalendarService:
 
     _instance: Optional["GoogleCalendarService"] = None
     _service: Optional[Resource] = None
+    _credentials: Optional[service_account.Credentials] = None
+    _local = threading.local()
+    _lock = threading.Lock()
 
     def __new__(cls) -> "GoogleCalendarService":
         """Ensure singleton pattern."""
@@ -37,23 +53,115 @@ class GoogleCalendarService:
         if self._service is not None:
             return self._service
 
-        try:
-            self._service = self._create_service()
-            logger.info("Google Calendar service initialized successfully")
-            return self._service
-        except Exception as e:
-            logger.error(f"Failed to initialize Google Calendar service: {e}")
-            raise
+        with self._lock:
+            if self._service is not None:
+                return self._service
+            try:
+                self._service = self._create_service()
+                logger.info("Google Calendar service initialized successfully")
+                return self._service
+            except Exception as e:
+                logger.error(f"Failed to initialize Google Calendar service: {e}")
+                raise
 
     def _create_service(self) -> Resource:
         """Create Google Calendar service with credentials."""
         credentials = service_account.Credentials.from_service_account_file(settings.GOOGLE_APPLICATION_CREDENTIALS, scopes=settings.SCOPES_CALENDER)
+        self._credentials = credentials
         return build("calendar", "v3", credentials=credentials)
 
+    def get_http(self) -> AuthorizedHttp:
+        """
+        Get the authorized HTTP transport for the current thread.
+
+        httplib2 connections are not thread-safe, so every worker thread
+        executes requests over its own transport instead of the one shared
+        by the `Resource`.
+        """
+        http = getattr(self._local, "http", None)
+        if http is None:
+            self.get_service()
+            http = AuthorizedHttp(self._credentials, http=httplib2.Http(timeout=settings.CALENDAR_TIMEOUT))
+            self._local.http = http
+        return http
+
     def reset_service(self):
         """Reset service instance (useful for testing)."""
         self._service = None
+        self._credentials = None
+        self._local = threading.local()
+
+
+def _create_calendar() -> Union[Resource, SQLiteCalendar]:
+    if settings.CALENDAR_BACKEND == "sqlite":
+        return SQLiteCalendar(settings.CALENDAR_DB)
+    return GoogleCalendarService().get_service()
+
+
+# the Calendar client is created on first use, not at import time
+CALENDAR_PROVIDER: Lazy[Union[Resource, SQLiteCalendar]] = Lazy("calendar", _create_calendar)
+
+
+def get_calendar_service() -> Union[Resource, SQLiteCalendar]:
+    """Return the shared calendar client: the Google Calendar API or the local SQLite calendar."""
+    return CALENDAR_PROVIDER.get()
+
+
+def _transport() -> Optional[AuthorizedHttp]:
+    """The calling thread's Google transport; local calendars need none."""
+    if settings.CALENDAR_BACKEND == "sqlite":
+        return None
+    return GoogleCalendarService().get_http()
+
 
+# maximum number of calls in one Calendar batch request
+BATCH_LIMIT = 50
 
-# create a global instance of the service
-CALENDAR_SERVICE: GoogleCalendarService = GoogleCalendarService().get_service()
+# bounded pool that runs blocking Calendar API calls off the event loop
+CALENDAR_EXECUTOR = ThreadPoolExecutor(max_workers=settings.CALENDAR_MAX_WORKERS, thread_name_prefix="calendar")
+
+
+def execute_request(request: Union[HttpRequest, LocalRequest]) -> Any:
+    """Execute a Calendar API request using the calling thread's transport."""
+    return request.execute(http=_transport())
+
+
+def execute_batch(requests: List[Tuple[str, Union[HttpRequest, LocalRequest]]]) -> Dict[str, Tuple[Any, Optional[Exception]]]:
+    """
+    Execute Calendar API requests through the batch HTTP endpoint.
+
+    Requests are sent in chunks of `BATCH_LIMIT` (the Calendar API maximum),
+    so a whole session is rescheduled in a few HTTPS round trips instead of
+    one per event.
+
+    Args:
+        requests: (request_id, request) pairs; request IDs must be unique.
+
+    Returns:
+        A mapping of request ID to (response, exception), where exception is
+        None on success.
+    """
+    results: Dict[str, Tuple[Any, Optional[Exception]]] = {}
+
+    def callback(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+        results[request_id] = (response, exception)
+
+    service = get_calendar_service()
+    for i in range(0, len(requests), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=callback)
+        for request_id, request in requests[i : i + BATCH_LIMIT]:
+            batch.add(request, request_id=request_id)
+        batch.execute(http=_transport())
+    return results
+
+
+async def run_in_calendar_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function on the calendar thread pool.
+
+    The caller's context variables (run config, tracing) are propagated to
+    the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(CALENDAR_EXECUTOR, functools.partial(ctx.run, func, *args, **kwargs))
@@ -0,0 +1,215 @@
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httplib2
+import pytz
+from googleapiclient.errors import HttpError
+
+LOCAL_TIMEZONE = pytz.timezone("Asia/Jakarta")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    calendar_id TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    version INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_start ON events (calendar_id, start_ts);
+CREATE INDEX IF NOT EXISTS idx_events_end ON events (calendar_id, end_ts);
+CREATE TABLE IF NOT EXISTS calendar_meta (
+    calendar_id TEXT PRIMARY KEY,
+    max_duration REAL NOT NULL
+);
+"""
+
+
+def _http_error(status: int, message: str) -> HttpError:
+    """Build the error the Google client raises, so callers handle both backends alike."""
+    return HttpError(httplib2.Response({"status": status}), json.dumps({"error": {"code": status, "message": message}}).encode())
+
+
+def _timestamp(bound: Dict[str, Any]) -> float:
+    """Epoch seconds of an event `start`/`end` (`dateTime`, or `date` at local midnight for all-day events)."""
+    if "dateTime" in bound:
+        moment = datetime.fromisoformat(bound["dateTime"].replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = pytz.timezone(bound.get("timeZone", LOCAL_TIMEZONE.zone)).localize(moment)
+        return moment.timestamp()
+    return LOCAL_TIMEZONE.localize(datetime.fromisoformat(bound["date"])).timestamp()
+
+
+class LocalRequest:
+    """
+    A deferred calendar operation, shaped like `googleapiclient.http.HttpRequest`.
+
+    `execute_request` and batches call `execute(http=...)`; the transport is
+    ignored. Headers are honoured where the Google API would: `If-Match` on
+    a patch fails with 412 when the event's ETag has changed.
+    """
+
+    def __init__(self, run: Callable[[Dict[str, str]], Any]):
+        self._run = run
+        self.headers: Dict[str, str] = {}
+
+    def execute(self, http: Any = None) -> Any:
+        return self._run(self.headers)
+
+
+class LocalBatch:
+    """Batch of LocalRequests, shaped like `googleapiclient.http.BatchHttpRequest`."""
+
+    def __init__(self, callback: Callable[[str, Any, Optional[Exception]], None]):
+        self._callback = callback
+        self._requests: List[Tuple[str, LocalRequest]] = []
+
+    def add(self, request: LocalRequest, request_id: str) -> None:
+        self._requests.append((request_id, request))
+
+    def execute(self, http: Any = None) -> None:
+        for request_id, request in self._requests:
+            try:
+                self._callback(request_id, request.execute(), None)
+            except HttpError as e:
+                self._callback(request_id, None, e)
+
+
+class SQLiteCalendar:
+    """
+    Local calendar stored in SQLite, with the Calendar v3 interface the tools use.
+
+    Implements `events().list/get/insert/patch/delete` and
+    `new_batch_http_request` on top of one table, so every calendar tool
+    runs unchanged against it. Window queries use the index on start time:
+    only events starting between `timeMin - longest event` and `timeMax`
+    can overlap the window, so the scan stays proportional to the result
+    instead of the calendar's history.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def events(self) -> "SQLiteCalendar":
+        return self
+
+    def new_batch_http_request(self, callback: Callable[[str, Any, Optional[Exception]], None]) -> LocalBatch:
+        return LocalBatch(callback)
+
+    @staticmethod
+    def _to_event(event_id: str, version: int, body: str) -> Dict[str, Any]:
+        return {**json.loads(body), "id": event_id, "etag": f'"{version}"'}
+
+    def _get(self, calendar_id: str, event_id: str) -> Tuple[int, Dict[str, Any]]:
+        row = self._conn.execute("SELECT version, body FROM events WHERE calendar_id = ? AND id = ?", (calendar_id, event_id)).fetchone()
+        if row is None:
+            raise _http_error(404, f"Event {event_id} not found")
+        return row[0], json.loads(row[1])
+
+    def _write(self, calendar_id: str, event_id: str, version: int, body: Dict[str, Any]) -> Dict[str, Any]:
+        start, end = _timestamp(body["start"]), _timestamp(body["end"])
+        if end < start:
+            raise _http_error(400, "The specified time range is empty")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO events (id, calendar_id, start_ts, end_ts, version, body) VALUES (?, ?, ?, ?, ?, ?)",
+            (event_id, calendar_id, start, end, version, json.dumps(body)),
+        )
+        self._conn.execute(
+            "INSERT INTO calendar_meta (calendar_id, max_duration) VALUES (?, ?) ON CONFLICT (calendar_id) DO UPDATE SET max_duration = MAX(max_duration, excluded.max_duration)",
+            (calendar_id, end - start),
+        )
+        return {**body, "id": event_id, "etag": f'"{version}"'}
+
+    def list(
+        self,
+        calendarId: str,
+        timeMin: Optional[str] = None,
+        timeMax: Optional[str] = None,
+        maxResults: int = 250,
+        singleEvents: bool = True,
+        orderBy: str = "startTime",
+        pageToken: Optional[str] = None,
+        **kwargs: Any,
+    ) -> LocalRequest:
+        """Events overlapping [timeMin, timeMax), by start time; `nextPageToken` is set when more than `maxResults` match."""
+        offset = int(pageToken or 0)
+
+        def run(headers: Dict[str, str]) -> Dict[str, Any]:
+            lo = _timestamp({"dateTime": timeMin}) if timeMin else float("-inf")
+            hi = _timestamp({"dateTime": timeMax}) if timeMax else float("inf")
+            with self._lock:
+                row = self._conn.execute("SELECT max_duration FROM calendar_meta WHERE calendar_id = ?", (calendarId,)).fetchone()
+                earliest_start = lo - (row[0] if row else 0.0)
+                rows = self._conn.execute(
+                    "SELECT id, version, body FROM events WHERE calendar_id = ? AND start_ts >= ? AND start_ts < ? AND end_ts > ? ORDER BY start_ts, id LIMIT ? OFFSET ?",
+                    (calendarId, earliest_start, hi, lo, maxResults + 1, offset),
+                ).fetchall()
+            result: Dict[str, Any] = {"kind": "calendar#events", "items": [self._to_event(*row) for row in rows[:maxResults]]}
+            if len(rows) > maxResults:
+                result["nextPageToken"] = str(offset + maxResults)
+            return result
+
+        return LocalRequest(run)
+
+    def get(self, calendarId: str, eventId: str, **kwargs: Any) -> LocalRequest:
+        def run(headers: Dict[str, str]) -> Dict[str, Any]:
+            with self._lock:
+                version, body = self._get(calendarId, eventId)
+            return {**body, "id": eventId, "etag": f'"{version}"'}
+
+        return LocalRequest(run)
+
+    def insert(self, calendarId: str, body: Dict[str, Any], **kwargs: Any) -> LocalRequest:
+        def run(headers: Dict[str, str]) -> Dict[str, Any]:
+            now = datetime.now(timezone.utc).isoformat()
+            event = {"status": "confirmed", "created": now, "updated": now, "creator": {"email": calendarId}, **body}
+            event.pop("id", None)
+            with self._transaction():
+                return self._write(calendarId, uuid.uuid4().hex, 1, event)
+
+        return LocalRequest(run)
+
+    def patch(self, calendarId: str, eventId: str, body: Dict[str, Any], **kwargs: Any) -> LocalRequest:
+        def run(headers: Dict[str, str]) -> Dict[str, Any]:
+            with self._transaction():
+                version, event = self._get(calendarId, eventId)
+                if_match = headers.get("If-Match")
+                if if_match and if_match != f'"{version}"':
+                    raise _http_error(412, "Precondition Failed")
+                event.update({key: value for key, value in body.items() if key not in ("id", "etag")})
+                event["updated"] = datetime.now(timezone.utc).isoformat()
+                return self._write(calendarId, eventId, version + 1, event)
+
+        return LocalRequest(run)
+
+    def delete(self, calendarId: str, eventId: str, **kwargs: Any) -> LocalRequest:
+        def run(headers: Dict[str, str]) -> str:
+            with self._lock:
+                deleted = self._conn.execute("DELETE FROM events WHERE calendar_id = ? AND id = ?", (calendarId, eventId)).rowcount
+            if not deleted:
+                raise _http_error(404, f"Event {eventId} not found")
+            return ""
+
+        return LocalRequest(run)
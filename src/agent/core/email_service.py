@@ -1,19 +1,31 @@
-import smtplib
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future
+from dataclasses import asdict
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Any, Dict
+from typing import Any, Coroutine, Dict, List, Optional, Tuple
 
+import aiosmtplib
 from loguru import logger
 
 from src.agent.model import CancelAppointment, SendAppointment, UpdateAppointment
 from src.agent.setting import settings
 
+from .lazy import Lazy
+from .outbox import EmailOutbox
+from .smtp_pool import SMTPConnectionPool
 from .template_email import EmailContent, EmailTemplates
 
 
 class GmailServiceSMTP:
     """
     Gmail SMTP service for sending emails.
+
+    Messages are delivered through a pool of persistent SMTP connections that
+    lives on a dedicated transport event loop, so sync callers (tools running in
+    worker threads) and async callers share the same authenticated sessions.
     """
 
     def __init__(self):
@@ -22,26 +34,67 @@ class GmailServiceSMTP:
         self.smtp_server = settings.SMTP_SERVER
         self.smtp_port = settings.SMTP_PORT
 
-    def send_email(self, content: EmailContent) -> Dict[str, Any]:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pool: Optional[SMTPConnectionPool] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the transport loop thread on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="smtp-transport", daemon=True).start()
+                self._loop = loop
+                atexit.register(self.close)
+        return self._loop
+
+    def _get_pool(self) -> SMTPConnectionPool:
+        """Create the connection pool (must run on the transport loop)."""
+        if self._pool is None:
+            self._pool = SMTPConnectionPool(
+                hostname=self.smtp_server,
+                port=self.smtp_port,
+                username=self.email,
+                password=self.app_password,
+                max_size=settings.SMTP_POOL_SIZE,
+                idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT,
+                timeout=settings.SMTP_TIMEOUT,
+            )
+        return self._pool
+
+    def _submit(self, coro: Coroutine[Any, Any, Dict[str, Any]]) -> Future:
+        """Schedule a coroutine on the transport loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+    def _build_message(self, content: EmailContent) -> MIMEMultipart:
+        """Build a multipart (plain text + HTML) message."""
+        msg = MIMEMultipart("alternative")
+        msg["From"] = f"{content.sender_name} <{self.email}>"
+        msg["To"] = ", ".join(content.recipients)
+        msg["Subject"] = content.subject
+
+        # Add HTML and plain text parts
+        msg.attach(MIMEText(content.text_body, "plain", "utf-8"))
+        msg.attach(MIMEText(content.html_body, "html", "utf-8"))
+        return msg
+
+    async def _deliver(self, content: EmailContent) -> Dict[str, Any]:
+        """Send one message over a pooled connection (runs on the transport loop)."""
         try:
-            # Create message
-            msg = MIMEMultipart("alternative")
-            msg["From"] = f"{content.sender_name} <{self.email}>"
-            msg["To"] = ", ".join(content.recipients)
-            msg["Subject"] = content.subject
-
-            # Add HTML and plain text parts
-            text_part = MIMEText(content.text_body, "plain", "utf-8")
-            html_part = MIMEText(content.html_body, "html", "utf-8")
-
-            msg.attach(text_part)
-            msg.attach(html_part)
-
-            # Send via SMTP
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email, self.app_password)
-                server.send_message(msg)
+            msg = self._build_message(content)
+            pool = self._get_pool()
+
+            # A pooled session can be dropped by the server right after its
+            # health check; retry once on a fresh connection in that case.
+            for attempt in range(2):
+                try:
+                    async with pool.connection() as client:
+                        await client.send_message(msg)
+                    break
+                except aiosmtplib.SMTPServerDisconnected:
+                    if attempt:
+                        raise
+                    logger.warning("SMTP connection dropped, retrying on a new connection")
 
             logger.info(f"Email sent successfully to {content.recipients}")
             return {"success": True, "message": "Email sent successfully"}
@@ -50,9 +103,43 @@ class GmailServiceSMTP:
             logger.error(f"Gmail SMTP error: {e}")
             return {"success": False, "message": f"Failed to send email: {str(e)}"}
 
+    def send_email(self, content: EmailContent) -> Dict[str, Any]:
+        """Send an email, blocking the calling thread until it is delivered."""
+        return self._submit(self._deliver(content)).result()
+
     async def async_send_email(self, content: EmailContent) -> Dict[str, Any]:
-        # TODO: Implement asynchronous email sending using a library like aiosmtplib
-        raise NotImplementedError("Asynchronous email sending is not yet implemented.")
+        """Send an email without blocking the caller's event loop."""
+        return await asyncio.wrap_future(self._submit(self._deliver(content)))
+
+    def send_many(self, contents: List[EmailContent]) -> List[Dict[str, Any]]:
+        """Send several emails concurrently over the pool, blocking until all are done."""
+
+        async def _deliver_all() -> List[Dict[str, Any]]:
+            return await asyncio.gather(*(self._deliver(content) for content in contents))
+
+        return self._submit(_deliver_all()).result()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Close pooled connections and stop the transport loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._pool is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._pool.close(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Failed to close SMTP pool cleanly: {e}")
+            self._pool = None
+        loop.call_soon_threadsafe(loop.stop)
+
+
+# notification kind -> (payload model, template)
+APPOINTMENT_TEMPLATES = {
+    "appointment_created": (SendAppointment, EmailTemplates.appointment_created),
+    "appointment_updated": (UpdateAppointment, EmailTemplates.appointment_updated),
+    "appointment_cancelled": (CancelAppointment, EmailTemplates.appointment_cancelled),
+}
 
 
 class EmailNotificationService:
@@ -60,28 +147,67 @@ class EmailNotificationService:
 
     def __init__(self):
         self.primary_provider = GmailServiceSMTP()
+        self.outbox = EmailOutbox(
+            db_path=settings.OUTBOX_DB,
+            sender=self._send_outbox_batch,
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+        )
+        # drain notifications left over from a previous run
+        self.outbox.start()
         logger.info("Email service initialized")
 
-    def send_appointment_created(self, data: SendAppointment) -> Dict[str, Any]:
-        """Send appointment confirmation email"""
-        template = EmailTemplates.appointment_created(data=data)
+    @staticmethod
+    def build_email(kind: str, payload: Dict[str, Any]) -> EmailContent:
+        """Render the email for a notification kind and payload."""
+        model, template_fn = APPOINTMENT_TEMPLATES[kind]
+        data = model(**payload)
 
+        template = template_fn(data=data)
         template.recipients = [data.patient_email]
-        return self.primary_provider.send_email(template)
+        return template
+
+    def _send_outbox_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Deliver a batch claimed by the outbox worker."""
+        return self.primary_provider.send_many([self.build_email(kind, payload) for kind, payload in items])
+
+    def send_appointment_created(self, data: SendAppointment) -> Dict[str, Any]:
+        """Send appointment confirmation email"""
+        return self.primary_provider.send_email(self.build_email("appointment_created", asdict(data)))
 
     def send_appointment_updated(self, data: UpdateAppointment) -> Dict[str, Any]:
         """Send appointment update email"""
-        template = EmailTemplates.appointment_updated(data=data)
-
-        template.recipients = [data.patient_email]
-        return self.primary_provider.send_email(template)
+        return self.primary_provider.send_email(self.build_email("appointment_updated", asdict(data)))
 
     def send_appointment_cancelled(self, data: CancelAppointment) -> Dict[str, Any]:
         """Send appointment cancellation email"""
-        template = EmailTemplates.appointment_cancelled(data=data)
+        return self.primary_provider.send_email(self.build_email("appointment_cancelled", asdict(data)))
 
-        template.recipients = [data.patient_email]
-        return self.primary_provider.send_email(template)
+    def queue_appointment_created(self, data: SendAppointment) -> str:
+        """Queue appointment confirmation email, returns the notification ID"""
+        return self.outbox.enqueue("appointment_created", asdict(data))
+
+    def queue_appointment_updated(self, data: UpdateAppointment) -> str:
+        """Queue appointment update email, returns the notification ID"""
+        return self.outbox.enqueue("appointment_updated", asdict(data))
+
+    def queue_appointment_cancelled(self, data: CancelAppointment) -> str:
+        """Queue appointment cancellation email, returns the notification ID"""
+        return self.outbox.enqueue("appointment_cancelled", asdict(data))
+
+    def queue_many(self, items: List[Tuple[str, Any]]) -> List[str]:
+        """Queue several notifications at once from (kind, appointment data) pairs"""
+        return self.outbox.enqueue_many([(kind, asdict(data)) for kind, data in items])
+
+    def get_notification_status(self, notification_id: str) -> Optional[Dict[str, Any]]:
+        """Return the delivery status of a queued notification"""
+        return self.outbox.get_status(notification_id)
+
+
+# created on first use, which also starts the outbox worker
+EMAIL_PROVIDER: Lazy[EmailNotificationService] = Lazy("email", EmailNotificationService)
 
 
-EMAIL_SERVICE: EmailNotificationService = EmailNotificationService()
+def get_email_service() -> EmailNotificationService:
+    """Return the shared email notification service."""
+    return EMAIL_PROVIDER.get()
@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Generic, Iterable, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+# every provider created with `Lazy`, by name, so they can be warmed up together
+PROVIDERS: Dict[str, "Lazy"] = {}
+
+
+class Lazy(Generic[T]):
+    """
+    Thread-safe, lazily-initialised service provider.
+
+    The factory runs on the first `get()` instead of at import time, so
+    importing the graph stays fast and does not fail when a backend is
+    unreachable. Concurrent first calls build the value only once.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self.factory = factory
+        self._value: Optional[T] = None
+        self._initialized = False
+        self._lock = threading.Lock()
+        PROVIDERS[name] = self
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def get(self) -> T:
+        """Return the value, creating it on first use."""
+        if self._initialized:
+            return self._value
+
+        with self._lock:
+            if not self._initialized:
+                start = time.perf_counter()
+                self._value = self.factory()
+                self._initialized = True
+                logger.debug(f"Initialized {self.name} in {time.perf_counter() - start:.3f}s")
+        return self._value
+
+    def override(self, value: T) -> None:
+        """Replace the value, e.g. with a stand-in for tests or benchmarks."""
+        with self._lock:
+            self._value = value
+            self._initialized = True
+
+    def reset(self) -> None:
+        """Drop the value so the next `get()` creates it again."""
+        with self._lock:
+            self._value = None
+            self._initialized = False
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+    """
+    Initialise providers ahead of the first request.
+
+    Providers are created in parallel and failures are logged instead of
+    raised, so one unreachable backend does not stop the others.
+
+    Args:
+        names: Providers to initialise; all registered providers by default.
+
+    Returns:
+        A mapping of provider name to None on success or the error message.
+    """
+    providers = [PROVIDERS[name] for name in names] if names is not None else list(PROVIDERS.values())
+
+    def _init(provider: Lazy) -> Optional[str]:
+        try:
+            provider.get()
+            return None
+        except Exception as e:
+            logger.error(f"Warm-up of {provider.name} failed: {e}")
+            return str(e)
+
+    if not providers:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="warm-up") as pool:
+        errors = list(pool.map(_init, providers))
+    return {provider.name: error for provider, error in zip(providers, errors)}
@@ -0,0 +1,186 @@
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS: Tuple[float, ...] = (16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768)
+COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 4, 5, 7, 10, 15, 25)
+WAIT_BUCKETS: Tuple[float, ...] = (1, 5, 15, 30, 60, 120, 300, 900, 1800, 3600)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """Monotonic counter, one series per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_labels(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(labels)} {value:g}" for labels, value in sorted(self._values.items())]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {_format_labels(labels) or "total": value for labels, value in self._values.items()}
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # per label set: bucket counts (last one is +Inf), sum, count
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(_labels(labels))
+            return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        with self._lock:
+            series = self._series.get(_labels(labels))
+            if not series or not sum(series[0]):
+                return None
+            rank, seen = q * sum(series[0]), 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[0]):
+                seen += n
+                if seen >= rank:
+                    return bound
+            return float("inf")
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for labels, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {total[0]:g}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                _format_labels(labels) or "total": {"count": sum(counts), "sum": round(total[0], 6), "avg": round(total[0] / sum(counts), 6) if sum(counts) else 0.0} for labels, (counts, total) in self._series.items()
+            }
+
+
+class MetricsRegistry:
+    """
+    In-process metrics, exportable in the Prometheus text format.
+
+    Besides its own counters and histograms, the registry reports the
+    `stats()` of registered collectors (caches, the memory writer, ...) as
+    gauges, read at render time.
+    """
+
+    def __init__(self, prefix: str = "agent"):
+        self.prefix = prefix
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: Any) -> Any:
+        full_name = f"{self.prefix}_{name}"
+        with self._lock:
+            if full_name not in self._metrics:
+                self._metrics[full_name] = cls(full_name, *args)
+            return self._metrics[full_name]
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get_or_create(Counter, name, help)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets)
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """Report the numeric values returned by `collect()` as `<prefix>_<name>_<key>` gauges."""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def _collected(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            collectors = list(self._collectors.items())
+        values = []
+        for name, collect in collectors:
+            stack = [(f"{self.prefix}_{name}", collect())]
+            while stack:
+                prefix, stats = stack.pop()
+                for key, value in stats.items():
+                    if isinstance(value, dict):
+                        stack.append((f"{prefix}_{key}", value))
+                    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                        values.append((f"{prefix}_{key}", float(value)))
+        return sorted(values)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            lines += [f"# HELP {name} {metric.help}", f"# TYPE {name} {metric.kind}", *metric.render()]
+        for name, value in self._collected():
+            lines += [f"# TYPE {name} gauge", f"{name} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as a plain dict, for logging or benchmarks."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        return {**{name: metric.snapshot() for name, metric in metrics}, **dict(self._collected())}
+
+
+METRICS = MetricsRegistry()
+
+LLM_LATENCY = METRICS.histogram("llm_latency_seconds", "Chat model call latency in call_model.")
+LLM_TOKENS = METRICS.histogram("llm_tokens", "Prompt and completion tokens per chat model call.", TOKEN_BUCKETS)
+MEMORY_SEARCH_LATENCY = METRICS.histogram("memory_search_latency_seconds", "Long-term memory search latency.")
+TOOL_LATENCY = METRICS.histogram("tool_latency_seconds", "Tool call latency.")
+TOOL_CALLS = METRICS.counter("tool_calls_total", "Tool calls, by tool and status.")
+TOOL_ITERATIONS = METRICS.histogram("tool_iterations_per_turn", "Model steps with tool calls before the final answer.", COUNT_BUCKETS)
+HITL_WAIT = METRICS.histogram("hitl_wait_seconds", "Time from a review interrupt to its resume.", WAIT_BUCKETS)
@@ -0,0 +1,208 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+# (kind, payload) pairs in, one {"success": bool, "message": str} result per pair out
+BatchSender = Callable[[List[Tuple[str, Dict[str, Any]]]], List[Dict[str, Any]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class EmailOutbox:
+    """
+    Durable, SQLite-backed outbox for notification emails.
+
+    Producers call `enqueue` and return immediately; a background worker thread
+    claims due messages in batches, hands them to `sender` and records the
+    outcome. Failed deliveries are retried with exponential backoff until
+    `max_attempts` is reached.
+
+    Delivery is at-least-once: a message is claimed with a lease, and if the
+    process dies before the result is written the lease expires and the
+    message is picked up again.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        sender: BatchSender,
+        batch_size: int = 10,
+        max_attempts: int = 5,
+        base_delay: float = 5.0,
+        max_delay: float = 600.0,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 5.0,
+    ):
+        self.db_path = Path(db_path)
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> str:
+        """
+        Store a notification for asynchronous delivery.
+
+        Args:
+            kind: Notification kind understood by the sender.
+            payload: JSON-serialisable notification data.
+
+        Returns:
+            str: The notification ID, usable with `get_status`.
+        """
+        return self.enqueue_many([(kind, payload)])[0]
+
+    def enqueue_many(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """
+        Store several notifications in a single transaction.
+
+        Args:
+            items: (kind, payload) pairs, see `enqueue`.
+
+        Returns:
+            List[str]: The notification IDs, in the same order as `items`.
+        """
+        now = time.time()
+        rows = [(uuid.uuid4().hex, kind, json.dumps(payload), STATUS_PENDING, now, now, now) for kind, payload in items]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO outbox (id, kind, payload, status, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        logger.info(f"Queued {len(rows)} notification(s)")
+
+        self.start()
+        self._wakeup.set()
+        return [row[0] for row in rows]
+
+    def get_status(self, notification_id: str) -> Optional[Dict[str, Any]]:
+        """Return the delivery status of a notification, or None if unknown."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, attempts, last_error, created_at, updated_at FROM outbox WHERE id = ?",
+                (notification_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def _claim_batch(self) -> List[sqlite3.Row]:
+        """Lease up to `batch_size` due messages to this worker."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, kind, payload, attempts FROM outbox WHERE status IN (?, ?) AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (STATUS_PENDING, STATUS_SENDING, now, self.batch_size),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, next_attempt_at = ?, updated_at = ? WHERE id = ?",
+                [(STATUS_SENDING, now + self.lease_seconds, now, row["id"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+            return rows
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _process_batch(self, rows: List[sqlite3.Row]) -> None:
+        """Send a claimed batch and record each outcome."""
+        items = [(row["kind"], json.loads(row["payload"])) for row in rows]
+        try:
+            results = self.sender(items)
+        except Exception as e:
+            results = [{"success": False, "message": str(e)}] * len(rows)
+
+        now = time.time()
+        updates = []
+        for row, result in zip(rows, results):
+            attempts = row["attempts"] + 1
+            if result.get("success"):
+                updates.append((STATUS_SENT, now, None, now, row["id"]))
+            elif attempts >= self.max_attempts:
+                logger.error(f"Notification {row['id']} failed permanently: {result.get('message')}")
+                updates.append((STATUS_FAILED, now, result.get("message"), now, row["id"]))
+            else:
+                logger.warning(f"Notification {row['id']} failed (attempt {attempts}), retrying")
+                updates.append((STATUS_PENDING, now + self._backoff(attempts), result.get("message"), now, row["id"]))
+
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "UPDATE outbox SET status = ?, next_attempt_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                updates,
+            )
+
+    def _run(self) -> None:
+        logger.info("Email outbox worker started")
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                rows = self._claim_batch()
+                if rows:
+                    self._process_batch(rows)
+                    continue
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {e}")
+
+            self._wakeup.wait(self.poll_interval)
+        logger.info("Email outbox worker stopped")
+
+    def start(self) -> None:
+        """Start the worker thread if it is not running yet."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stopping.clear()
+                self._worker = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker after its current batch; undelivered messages stay queued."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
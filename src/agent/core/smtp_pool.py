@@ -0,0 +1,149 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional
+
+import aiosmtplib
+from loguru import logger
+
+
+@dataclass
+class PooledConnection:
+    """An authenticated SMTP session owned by the pool."""
+
+    client: aiosmtplib.SMTP
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SMTPConnectionPool:
+    """
+    Pool of persistent, authenticated SMTP connections.
+
+    Connections are opened lazily (connect + STARTTLS + login) and handed back
+    to the pool after each message, so a burst of emails reuses a handful of
+    TLS sessions instead of paying the handshake for every message.
+
+    Idle connections older than ``idle_timeout`` are closed and reopened on the
+    next acquire (SMTP servers drop idle sessions), and connections idle for
+    more than ``health_check_interval`` are probed with ``NOOP`` first.
+
+    All methods must be awaited from the same event loop.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str,
+        password: str,
+        max_size: int = 4,
+        idle_timeout: float = 240.0,
+        health_check_interval: float = 30.0,
+        timeout: float = 30.0,
+        start_tls: Optional[bool] = None,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.start_tls = start_tls
+
+        self._idle: List[PooledConnection] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._closed = False
+
+    async def _open(self) -> PooledConnection:
+        """Open a new connection and authenticate it."""
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            timeout=self.timeout,
+            start_tls=self.start_tls,
+        )
+        await client.connect()
+        if self.username:
+            await client.login(self.username, self.password)
+        logger.debug(f"Opened SMTP connection to {self.hostname}:{self.port}")
+        return PooledConnection(client=client)
+
+    async def _discard(self, conn: PooledConnection) -> None:
+        """Close a connection, ignoring errors from an already dead socket."""
+        try:
+            if conn.client.is_connected:
+                await conn.client.quit()
+        except Exception:
+            conn.client.close()
+
+    async def _is_healthy(self, conn: PooledConnection) -> bool:
+        """Check whether an idle connection can still be used."""
+        if not conn.client.is_connected:
+            return False
+
+        idle_for = time.monotonic() - conn.last_used
+        if idle_for > self.idle_timeout:
+            return False
+        if idle_for > self.health_check_interval:
+            try:
+                await conn.client.noop()
+            except aiosmtplib.SMTPException:
+                return False
+        return True
+
+    async def acquire(self) -> PooledConnection:
+        """
+        Get a healthy connection, opening a new one if none is idle.
+
+        Raises:
+            RuntimeError: If the pool has been closed.
+            aiosmtplib.SMTPException: If a new connection cannot be opened.
+        """
+        if self._closed:
+            raise RuntimeError("SMTP connection pool is closed")
+
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if await self._is_healthy(conn):
+                    return conn
+                logger.debug("Dropping stale SMTP connection")
+                await self._discard(conn)
+            return await self._open()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, conn: PooledConnection, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it if it is broken."""
+        try:
+            if discard or self._closed or not conn.client.is_connected:
+                await self._discard(conn)
+            else:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Borrow a connection for the duration of the block."""
+        conn = await self.acquire()
+        try:
+            yield conn.client
+        except BaseException:
+            await self.release(conn, discard=True)
+            raise
+        await self.release(conn)
+
+    async def close(self) -> None:
+        """Close all idle connections and refuse further acquires."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._discard(conn) for conn in idle), return_exceptions=True)
+        logger.info("SMTP connection pool closed")
@@ -4,58 +4,111 @@ Works with a chat model with tool calling support.
 """
 
 import asyncio
+import threading
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, List, Literal, cast
+from typing import Any, Dict, List, Literal, Optional, Sequence, cast
 
 import pytz
-from langchain_core.messages import AIMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage, message_chunk_to_message
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph
-from langgraph.prebuilt import ToolNode
 from langgraph.runtime import Runtime
 from loguru import logger
 
 from src.agent.context import Context
-from src.agent.memory import save_memory_background, search_memory
+from src.agent.context_window import clip_memory_context, prepare_context, summarize_earlier_questions, token_budget
+from src.agent.core import warm_up
+from src.agent.core.metrics import LLM_LATENCY, LLM_TOKENS, TOOL_ITERATIONS
+from src.agent.memory import MEMORY_WRITER, NO_MEMORIES, search_memory
+from src.agent.response_cache import is_faq_only_turn, is_first_question, lookup_response, record_response
+from src.agent.setting import settings
 from src.agent.state import InputState, State
+from src.agent.tool_node import ParallelToolNode
 from src.agent.tools import TOOLS_CALENDAR, TOOLS_KNOWLEDGE_BASE
-from src.agent.utils import get_message_text, load_chat_model, task_done_callback
+from src.agent.utils import configure_logging, get_bound_model, get_message_text
 
-logger.add("logger.log", rotation="10 MB", retention="10 days", level="DEBUG")
+
+async def generate(model: Runnable, messages: Sequence[Any]) -> AIMessage:
+    """
+    Run the model, streaming its text to the graph's `custom` stream channel.
+
+    Chunks are summed into a single message, which also merges the partial
+    tool calls, so callers see the same AIMessage that `ainvoke` returns.
+    With STREAM_RESPONSES off the model is invoked in one go.
+    """
+    if not settings.STREAM_RESPONSES:
+        return cast(AIMessage, await model.ainvoke(messages))
+
+    writer = get_stream_writer()
+    response: Optional[AIMessageChunk] = None
+    async for chunk in model.astream(messages):
+        response = chunk if response is None else response + chunk
+        text = get_message_text(chunk)
+        if text:
+            writer({"type": "token", "id": response.id, "content": text})
+    if response is None:
+        raise ValueError("Model returned an empty stream")
+    return cast(AIMessage, message_chunk_to_message(response))
 
 
 async def call_model(
     state: State,
     config: RunnableConfig,
     runtime: Runtime[Context],
-) -> Dict[str, List[AIMessage]]:
+) -> Dict[str, Any]:
     """Call the LLM powering our agent."""
+    configure_logging()
     logger.info("Call agent...")
     tz = pytz.timezone("Asia/Jakarta")
 
     # get messages from state
     messages = state.messages
     user_id = config["configurable"]["thread_id"]
-    user_message = get_message_text(messages[-1])
-
-    context = await search_memory(
-        query=user_message,
-        user_id=user_id,
-    )
-
-    model = load_chat_model(runtime.context.model).bind_tools(TOOLS_KNOWLEDGE_BASE + TOOLS_CALENDAR)
+    human_index = next((i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)), None)
+    last_human = messages[human_index] if human_index is not None else None
+    turn_id = last_human.id if last_human else None
+    user_message = get_message_text(last_human) if last_human else ""
+
+    tools = TOOLS_KNOWLEDGE_BASE + TOOLS_CALENDAR
+    update: Dict[str, Any] = {}
+
+    if turn_id is not None and state.memory_turn_id == turn_id and state.memory_context is not None:
+        # steps after a tool call reuse the memory searched for this turn
+        context = state.memory_context
+        model = get_bound_model(runtime.context.model, tools)
+    else:
+        # search memory while the model is prepared in a worker thread
+        memory_task = asyncio.create_task(search_memory(query=user_message, user_id=user_id))
+        try:
+            model = await asyncio.to_thread(get_bound_model, runtime.context.model, tools)
+        except Exception:
+            memory_task.cancel()
+            raise
+        context = await memory_task
+        update = {"memory_context": context, "memory_turn_id": turn_id}
 
     system_message = runtime.context.system_prompt.format(
         time=datetime.now(tz=tz).strftime("%Y-%m-%d %H:%M:%S"),
-        conversation_history=context,
+        conversation_history=clip_memory_context(context, settings.MEMORY_CONTEXT_MAX_TOKENS),
     )
 
-    response = cast(
-        AIMessage,
-        await model.ainvoke(
-            [{"role": "system", "content": system_message}, *messages],
-        ),
-    )
+    # fit the history into the model's token budget
+    prepared = prepare_context(messages, count_tokens_approximately([SystemMessage(system_message)]), token_budget(runtime.context.model))
+    if prepared.earlier_questions:
+        system_message += f"\n## EARLIER IN THIS CONVERSATION, THE USER ASKED:\n{summarize_earlier_questions(prepared.earlier_questions)}\n"
+    if prepared.tokens_after < prepared.tokens_before:
+        logger.info(f"Context trimmed from ~{prepared.tokens_before} to ~{prepared.tokens_after} tokens")
+
+    started = time.perf_counter()
+    response = await generate(model, [{"role": "system", "content": system_message}, *prepared.messages])
+    LLM_LATENCY.observe(time.perf_counter() - started, model=runtime.context.model)
+    if response.usage_metadata:
+        LLM_TOKENS.observe(response.usage_metadata["input_tokens"], model=runtime.context.model, kind="prompt")
+        LLM_TOKENS.observe(response.usage_metadata["output_tokens"], model=runtime.context.model, kind="completion")
 
     if state.is_last_step and response.tool_calls:
         return {
@@ -64,9 +117,14 @@ async def call_model(
                     id=response.id,
                     content=("Sorry, I could not find an answer to your question in the specified number of steps."),
                 )
-            ]
+            ],
+            **update,
         }
 
+    if not response.tool_calls:
+        turn = messages[human_index + 1 :] if last_human else messages
+        TOOL_ITERATIONS.observe(sum(1 for message in turn if isinstance(message, AIMessage) and message.tool_calls))
+
     if not response.tool_calls and response.content:
         metadata = {"timestamp": datetime.now(tz=tz).strftime("%Y-%m-%d %H:%M:%S")}
 
@@ -76,11 +134,50 @@ async def call_model(
             {"role": "assistant", "content": response.content},
         ]
 
-        task = asyncio.create_task(save_memory_background(conversation, user_id, metadata))
+        MEMORY_WRITER.submit(conversation, user_id, metadata)
+
+        # cached answers are shared by all users: only record answers that saw no
+        # memories of this user and no earlier messages of this thread
+        context_free = not context or context == NO_MEMORIES
+        if settings.RESPONSE_CACHE_ENABLED and context_free and is_first_question(messages) and is_faq_only_turn(messages[human_index + 1 :]):
+            try:
+                await asyncio.to_thread(record_response, user_message, get_message_text(response))
+            except Exception as e:
+                logger.error(f"Response cache store failed: {e}")
+
+    return {"messages": [response], **update}
+
+
+async def check_response_cache(state: State) -> Dict[str, List[AIMessage]]:
+    """
+    Answer from the semantic response cache if a similar FAQ question was answered before.
+
+    Only the first question of a thread is looked up: cached answers carry no
+    thread history, so a follow-up always goes to the model.
+    """
+    configure_logging()
+    last_message = state.messages[-1]
+    if not isinstance(last_message, HumanMessage) or not is_first_question(state.messages):
+        return {}
+
+    try:
+        cached = await asyncio.to_thread(lookup_response, get_message_text(last_message))
+    except Exception as e:
+        logger.error(f"Response cache lookup failed: {e}")
+        return {}
+    if cached is None:
+        return {}
+
+    logger.info(f"Serving cached response for '{cached.question}' ({cached.hits} hits)")
+    response = AIMessage(content=cached.answer, id=str(uuid.uuid4()), response_metadata={"response_cache": True})
+    if settings.STREAM_RESPONSES:
+        get_stream_writer()({"type": "token", "id": response.id, "content": cached.answer})
+    return {"messages": [response]}
 
-        task.add_done_callback(task_done_callback)
 
-    return {"messages": [response]}
+def route_response_cache(state: State) -> Literal["__end__", "call_model"]:
+    """End the turn if the cache answered it, otherwise call the model."""
+    return "__end__" if isinstance(state.messages[-1], AIMessage) else "call_model"
 
 
 def route_model_output(state: State) -> Literal["__end__", "tools"]:
@@ -99,10 +196,27 @@ def route_model_output(state: State) -> Literal["__end__", "tools"]:
 
 builder = StateGraph(State, input_schema=InputState, context_schema=Context)
 builder.add_node("call_model", call_model)
-builder.add_node("tools", ToolNode(TOOLS_KNOWLEDGE_BASE + TOOLS_CALENDAR))
-
-builder.add_edge("__start__", "call_model")
+builder.add_node(
+    "tools",
+    ParallelToolNode(
+        TOOLS_KNOWLEDGE_BASE + TOOLS_CALENDAR,
+        max_concurrency=settings.TOOL_MAX_CONCURRENCY,
+        timeout=settings.TOOL_TIMEOUT,
+        timeouts=settings.TOOL_TIMEOUTS,
+    ),
+)
+
+if settings.RESPONSE_CACHE_ENABLED:
+    builder.add_node("check_response_cache", check_response_cache)
+    builder.add_edge("__start__", "check_response_cache")
+    builder.add_conditional_edges("check_response_cache", route_response_cache)
+else:
+    builder.add_edge("__start__", "call_model")
 builder.add_conditional_edges("call_model", route_model_output)
 builder.add_edge("tools", "call_model")
 
 graph = builder.compile(name="ReAct Agent")
+
+if settings.WARM_UP_ON_START:
+    # initialise backends in the background so the first request does not pay for it
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
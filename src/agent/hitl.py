@@ -1,9 +1,13 @@
 """Human-in-the-loop (HITL) wrapper for LangGraph tools."""
 
-from typing import Callable, Optional, Union
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple, Union
 
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import BaseTool
+from langchain_core.tools import BaseTool, StructuredTool
 from langchain_core.tools import tool as create_tool
 from langgraph.prebuilt.interrupt import (
     ActionRequest,
@@ -13,6 +17,18 @@ from langgraph.prebuilt.interrupt import (
 from langgraph.types import interrupt
 from loguru import logger
 
+from src.agent.core.metrics import HITL_WAIT
+
+# first interrupt time of pending reviews, to measure how long a review takes
+_PENDING_REVIEWS: "OrderedDict[str, float]" = OrderedDict()
+_PENDING_REVIEWS_LOCK = threading.Lock()
+_MAX_PENDING_REVIEWS = 1024
+
+
+def _review_key(config: RunnableConfig, name: str, tool_input: dict) -> str:
+    thread_id = config.get("configurable", {}).get("thread_id")
+    return f"{thread_id}:{name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
+
 
 def human_in_the_loop(
     tool: Union[Callable, BaseTool],
@@ -41,13 +57,18 @@ def human_in_the_loop(
             allow_accept=True,  # Allow direct acceptance
         )
 
-    @create_tool(
-        tool.name,
-        description=tool.description,
-        args_schema=tool.args_schema,
-    )
-    def call_tool_with_interrupt(config: RunnableConfig, **tool_input):
+    def request_review(config: RunnableConfig, tool_input: dict) -> Tuple[Optional[dict], Any]:
+        """Interrupt for review; return the args to run the tool with, or the user's feedback."""
         logger.info(f"Using interrupt tool {tool.name}")
+        # the node re-runs on resume: the first call marks when the review was asked for,
+        # and replays of reviews already answered find no mark and are not measured
+        key = _review_key(config, tool.name, tool_input)
+        with _PENDING_REVIEWS_LOCK:
+            asked_at = _PENDING_REVIEWS.get(key)
+            if asked_at is None:
+                _PENDING_REVIEWS[key] = time.time()
+            while len(_PENDING_REVIEWS) > _MAX_PENDING_REVIEWS:
+                _PENDING_REVIEWS.popitem(last=False)
         request = HumanInterrupt(
             action_request=ActionRequest(
                 action=tool.name,  # The action being requested
@@ -59,23 +80,45 @@ def human_in_the_loop(
 
         response = interrupt([request])[0]
 
+        with _PENDING_REVIEWS_LOCK:
+            _PENDING_REVIEWS.pop(key, None)
+        if asked_at is not None:
+            HITL_WAIT.observe(time.time() - asked_at, tool=tool.name, response=response["type"])
+
         if response["type"] == "accept":
-            tool_response = tool.invoke(tool_input, config)
             logger.success(f"Accepted tool: {tool.name}")
+            return tool_input, None
 
         elif response["type"] == "edit":
-            tool_input = response["args"]["args"]
-            tool_response = tool.invoke(tool_input, config)
             logger.success(f"Edited tool args for: {tool.name}")
+            return response["args"]["args"], None
 
         elif response["type"] == "response":
-            tool_response = response["args"]
             logger.success(f"User feedback captured for: {tool.name}")
+            return None, response["args"]
 
         else:
             logger.error(f"Unsupported interrupt response type: {response['type']}")
             raise ValueError(f"Unsupported interrupt response type: {response['type']}")
 
-        return tool_response
+    def call_tool_with_interrupt(config: RunnableConfig, **tool_input):
+        tool_args, feedback = request_review(config, tool_input)
+        if tool_args is None:
+            return feedback
+        return tool.invoke(tool_args, config)
+
+    async def acall_tool_with_interrupt(config: RunnableConfig, **tool_input):
+        tool_args, feedback = request_review(config, tool_input)
+        if tool_args is None:
+            return feedback
+        return await tool.ainvoke(tool_args, config)
 
-    return call_tool_with_interrupt
+    return StructuredTool.from_function(
+        func=call_tool_with_interrupt,
+        coroutine=acall_tool_with_interrupt,
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        # lets the tool node run reviewed tools one at a time
+        metadata={**(tool.metadata or {}), "hitl": True},
+    )
@@ -1,3 +1,16 @@
-from .client import save_memory_background, search_memory
+from .backend import LocalMemoryBackend, Mem0MemoryBackend, MemoryBackend
+from .client import MEMORY_BACKEND_PROVIDER, NO_MEMORIES, get_memory_backend, save_memory_background, search_memory
+from .writer import MEMORY_WRITER, MemoryWriteManager
 
-__all__ = ["search_memory", "save_memory_background"]
+__all__ = [
+    "MEMORY_BACKEND_PROVIDER",
+    "MEMORY_WRITER",
+    "NO_MEMORIES",
+    "LocalMemoryBackend",
+    "Mem0MemoryBackend",
+    "MemoryBackend",
+    "MemoryWriteManager",
+    "get_memory_backend",
+    "search_memory",
+    "save_memory_background",
+]
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    memory TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    metadata TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memories_user ON memories (user_id);
+"""
+
+
+class MemoryBackend(ABC):
+    """Long-term conversational memory, scoped per `user_id`."""
+
+    @abstractmethod
+    async def search(self, query: str, user_id: str, top_k: int = 10) -> List[str]:
+        """
+        Return the memories most relevant to `query`.
+
+        Args:
+            query: Text to search for.
+            user_id: Owner of the memories.
+            top_k: Maximum number of memories to return.
+
+        Returns:
+            List[str]: Memories, most relevant first.
+        """
+
+    @abstractmethod
+    async def add(self, conversation: List[Dict], user_id: str, metadata: Optional[Dict] = None) -> None:
+        """
+        Store memories extracted from a conversation.
+
+        Args:
+            conversation: Messages as {"role": ..., "content": ...} dicts.
+            user_id: Owner of the memories.
+            metadata: Extra data stored with the memories.
+        """
+
+
+class Mem0MemoryBackend(MemoryBackend):
+    """Memory hosted by the mem0 platform."""
+
+    def __init__(self, api_key: str):
+        # imported here: mem0 is slow to import and validates the API key over the network
+        from mem0 import AsyncMemoryClient
+
+        self.client = AsyncMemoryClient(api_key=api_key)
+
+    async def search(self, query: str, user_id: str, top_k: int = 10) -> List[str]:
+        memories = await self.client.search(query=query, user_id=user_id, top_k=top_k)
+        return [memory["memory"] for memory in memories or []]
+
+    async def add(self, conversation: List[Dict], user_id: str, metadata: Optional[Dict] = None) -> None:
+        await self.client.add(
+            conversation,
+            user_id=user_id,
+            metadata=metadata,
+            output_format="v1.1",
+        )
+
+
+class LocalMemoryBackend(MemoryBackend):
+    """
+    In-process memory backed by SQLite and local embeddings.
+
+    Every user message is embedded and stored as one memory. On the first
+    search for a user their embeddings are loaded into a normalised matrix,
+    so later searches are a single matrix-vector product with no network
+    round trip. Exact duplicates of an existing memory are not stored again.
+    """
+
+    def __init__(self, db_path: str, embeddings: Optional[Embeddings] = None):
+        if embeddings is None:
+            from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+
+            embeddings = FastEmbedEmbeddings()
+
+        self.db_path = Path(db_path)
+        self.embeddings = embeddings
+
+        # user_id -> (memories, normalised embedding matrix)
+        self._users: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _normalise(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _load_user(self, user_id: str) -> tuple:
+        with self._lock:
+            if user_id in self._users:
+                return self._users[user_id]
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT memory, embedding FROM memories WHERE user_id = ? ORDER BY created_at", (user_id,)).fetchall()
+        memories = [row[0] for row in rows]
+        matrix = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows]) if rows else np.empty((0, 0), dtype=np.float32)
+
+        with self._lock:
+            return self._users.setdefault(user_id, (memories, matrix))
+
+    def search_sync(self, query_vector: np.ndarray, user_id: str, top_k: int = 10) -> List[str]:
+        """Return the `top_k` memories closest to an already-embedded query."""
+        memories, matrix = self._load_user(user_id)
+        if not memories:
+            return []
+
+        scores = matrix @ self._normalise(np.asarray(query_vector, dtype=np.float32))
+        k = min(top_k, len(memories))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [memories[i] for i in top[np.argsort(-scores[top])]]
+
+    def add_sync(self, texts: List[str], user_id: str, metadata: Optional[Dict] = None) -> int:
+        """Embed and store `texts` for a user; returns the number of new memories."""
+        memories, _ = self._load_user(user_id)
+        texts = [text for text in dict.fromkeys(texts) if text and text not in memories]
+        if not texts:
+            return 0
+
+        vectors = self._normalise(np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32))
+        now = time.time()
+        rows = [(uuid.uuid4().hex, user_id, text, vector.tobytes(), json.dumps(metadata or {}), now) for text, vector in zip(texts, vectors)]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.executemany("INSERT INTO memories (id, user_id, memory, embedding, metadata, created_at) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+
+        with self._lock:
+            memories, matrix = self._users.get(user_id, ([], np.empty((0, 0), dtype=np.float32)))
+            matrix = np.vstack([matrix, vectors]) if matrix.size else vectors
+            self._users[user_id] = (memories + texts, matrix)
+        return len(texts)
+
+    async def search(self, query: str, user_id: str, top_k: int = 10) -> List[str]:
+        # embedding the query, loading the user's memories from SQLite and scoring all block
+        def run() -> List[str]:
+            return self.search_sync(self.embeddings.embed_query(query), user_id, top_k)
+
+        return await asyncio.to_thread(run)
+
+    async def add(self, conversation: List[Dict], user_id: str, metadata: Optional[Dict] = None) -> None:
+        texts = [message["content"] for message in conversation if message.get("role") == "user"]
+        added = await asyncio.to_thread(self.add_sync, texts, user_id, metadata)
+        logger.debug(f"Stored {added} local memories for user {user_id}")
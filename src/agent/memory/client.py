@@ -1,11 +1,34 @@
+import asyncio
+import time
 from typing import Dict, List
 
 from loguru import logger
-from mem0 import AsyncMemoryClient
 
+from src.agent.core import Lazy
+from src.agent.core.metrics import MEMORY_SEARCH_LATENCY
 from src.agent.setting import settings
 
-client = AsyncMemoryClient(api_key=settings.MEM0_API_KEY)
+from .backend import LocalMemoryBackend, Mem0MemoryBackend, MemoryBackend
+
+
+def _create_backend() -> MemoryBackend:
+    if settings.MEMORY_BACKEND == "local":
+        return LocalMemoryBackend(settings.MEMORY_DB)
+    return Mem0MemoryBackend(api_key=settings.MEM0_API_KEY)
+
+
+MEMORY_BACKEND_PROVIDER: Lazy[MemoryBackend] = Lazy("memory", _create_backend)
+
+
+async def get_memory_backend() -> MemoryBackend:
+    """Return the configured memory backend, creating it off the event loop on first use."""
+    if MEMORY_BACKEND_PROVIDER.initialized:
+        return MEMORY_BACKEND_PROVIDER.get()
+    return await asyncio.to_thread(MEMORY_BACKEND_PROVIDER.get)
+
+
+# returned by `search_memory` when the user has no matching memories
+NO_MEMORIES = "No relevant memories found."
 
 
 async def search_memory(query: str, user_id: str) -> str:
@@ -21,10 +44,13 @@ async def search_memory(query: str, user_id: str) -> str:
     """
     logger.info(f"Searching memory for query: '{query}' (user: {user_id})")
     try:
-        memories = await client.search(query=query, user_id=user_id, top_k=10)
+        backend = await get_memory_backend()
+        started = time.perf_counter()
+        memories = await backend.search(query=query, user_id=user_id, top_k=settings.MEMORY_TOP_K)
+        MEMORY_SEARCH_LATENCY.observe(time.perf_counter() - started, backend=settings.MEMORY_BACKEND)
         if not memories:
-            return "No relevant memories found."
-        context = "\n".join(f"- {memory['memory']}" for memory in memories)
+            return NO_MEMORIES
+        context = "\n".join(f"- {memory}" for memory in memories)
         return context
     except Exception as e:
         logger.error(f"Error searching memory for user {user_id}: {e}")
@@ -36,12 +62,8 @@ async def save_memory_background(conversation: List[Dict], user_id: str, metadat
     Background memory save with proper async handling
     """
     try:
-        await client.add(
-            conversation,
-            user_id=user_id,
-            metadata=metadata,
-            output_format="v1.1",
-        )
+        backend = await get_memory_backend()
+        await backend.add(conversation, user_id=user_id, metadata=metadata)
         logger.success(f"Memory saved successfully for user {user_id}")
 
     except Exception as e:
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from loguru import logger
+
+from src.agent.core import METRICS
+from src.agent.setting import settings
+
+from .client import save_memory_background
+
+MemoryWrite = Callable[[List[Dict], str, Dict], Awaitable[Any]]
+
+
+@dataclass
+class PendingWrite:
+    """Conversation waiting to be saved for one user."""
+
+    conversation: List[Dict]
+    metadata: Dict
+    enqueued_at: float = field(default_factory=time.monotonic)
+    merged: int = 1
+
+    def merge(self, conversation: List[Dict], metadata: Dict) -> None:
+        """Append the turns of a later save; the system prompt is kept once."""
+        self.conversation.extend(message for message in conversation if message.get("role") != "system")
+        self.metadata = {**self.metadata, **metadata}
+        self.merged += 1
+
+
+class MemoryWriteManager:
+    """
+    Bounded background queue for memory writes.
+
+    `submit` returns immediately. A fixed number of worker tasks perform the
+    writes, so the number of concurrent calls to the memory backend stays
+    bounded under load. A save for a user who already has a write waiting
+    is merged into that write, so a burst of turns costs one backend call.
+
+    When the queue is full, new writes are dropped and counted instead of
+    slowing down the response. `drain` and `shutdown` wait for queued writes
+    so they are not lost on restart.
+    """
+
+    def __init__(self, write: MemoryWrite, max_queue: int = 100, concurrency: int = 4):
+        self.write = write
+        self.max_queue = max_queue
+        self.concurrency = concurrency
+
+        self._pending: Dict[str, PendingWrite] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+        self._metrics = {
+            "submitted": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "completed": 0,
+            "failed": 0,
+            "in_flight": 0,
+            "max_queue_depth": 0,
+        }
+        self._wait_total = 0.0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        """Start the workers on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._pending:
+                logger.warning(f"Discarding {len(self._pending)} memory write(s) queued on a closed event loop")
+                self._metrics["dropped"] += len(self._pending)
+                self._pending.clear()
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._workers = {loop.create_task(self._worker(), name=f"memory-writer-{i}") for i in range(self.concurrency)}
+        return self._queue
+
+    def submit(self, conversation: List[Dict], user_id: str, metadata: Optional[Dict] = None) -> bool:
+        """
+        Queue a conversation to be saved to memory.
+
+        Must be called from the event loop that runs the graph.
+
+        Args:
+            conversation: Messages to save.
+            user_id: Owner of the memory.
+            metadata: Extra data stored with the memory.
+
+        Returns:
+            bool: False if the write was dropped because the queue is full or
+            the manager is shutting down.
+        """
+        self._metrics["submitted"] += 1
+        if self._closing:
+            self._metrics["dropped"] += 1
+            logger.warning(f"Memory writer is shutting down, dropped write for user {user_id}")
+            return False
+
+        queue = self._ensure_started()
+        pending = self._pending.get(user_id)
+        if pending is not None:
+            pending.merge(conversation, metadata or {})
+            self._metrics["coalesced"] += 1
+            return True
+
+        try:
+            queue.put_nowait(user_id)
+        except asyncio.QueueFull:
+            self._metrics["dropped"] += 1
+            logger.warning(f"Memory write queue full ({self.max_queue}), dropped write for user {user_id}")
+            return False
+
+        self._pending[user_id] = PendingWrite(list(conversation), dict(metadata or {}))
+        self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], queue.qsize())
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            user_id = await self._queue.get()
+            pending = self._pending.pop(user_id, None)
+            try:
+                if pending is None:
+                    continue
+                self._wait_total += time.monotonic() - pending.enqueued_at
+                self._metrics["in_flight"] += 1
+                result = await self.write(pending.conversation, user_id, pending.metadata)
+                if isinstance(result, dict) and "error" in result:
+                    self._metrics["failed"] += 1
+                else:
+                    self._metrics["completed"] += 1
+                    logger.debug(f"Memory write for user {user_id} completed ({pending.merged} turn(s))")
+            except Exception as e:
+                self._metrics["failed"] += 1
+                logger.error(f"Memory write for user {user_id} failed: {e}")
+            finally:
+                if pending is not None:
+                    self._metrics["in_flight"] -= 1
+                self._queue.task_done()
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued write has finished.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting writes, drain the queue and stop the workers."""
+        self._closing = True
+        if self._loop is not asyncio.get_running_loop():
+            return
+        if not await self.drain(timeout):
+            logger.warning(f"Memory writer drain timed out, {len(self._pending)} write(s) lost")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        self._queue = None
+        self._loop = None
+        logger.info(f"Memory writer stopped: {self.stats()}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return write counters, queue depth and the average queue wait."""
+        started = self._metrics["completed"] + self._metrics["failed"] + self._metrics["in_flight"]
+        return {
+            **self._metrics,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "avg_wait_ms": round(self._wait_total / started * 1000, 2) if started else 0.0,
+        }
+
+
+MEMORY_WRITER = MemoryWriteManager(
+    save_memory_background,
+    max_queue=settings.MEMORY_WRITE_QUEUE_SIZE,
+    concurrency=settings.MEMORY_WRITE_CONCURRENCY,
+)
+METRICS.register_collector("memory_writer", MEMORY_WRITER.stats)
@@ -0,0 +1,137 @@
+"""Semantic cache of answers to knowledge-base-only turns."""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from loguru import logger
+
+from src.agent.core import METRICS
+from src.agent.setting import settings
+from src.agent.tools.tool_retriever import VECTOR_STORE_PROVIDER, knowledge_base_tool
+
+
+@dataclass
+class CachedResponse:
+    """An answer served for questions similar to `question`."""
+
+    question: str
+    answer: str
+    vector: np.ndarray
+    generation: int
+    created_at: float
+    hits: int = 0
+    last_used_at: float = 0.0
+
+
+class SemanticResponseCache:
+    """
+    Answers to FAQ-only turns, looked up by question similarity.
+
+    A new question is served from the cache when its embedding has cosine
+    similarity of at least `threshold` with a previously answered question.
+    Entries expire after `ttl` seconds, and all of them are dropped when the
+    knowledge-base index generation changes, since the answer may be stale.
+    """
+
+    def __init__(self, threshold: float = 0.92, ttl: float = 86400.0, max_entries: int = 512):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.generation: Optional[int] = None
+
+        self._entries: List[CachedResponse] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_generation(self, generation: int) -> None:
+        if generation != self.generation:
+            if self._entries:
+                logger.info(f"Knowledge base changed, dropping {len(self._entries)} cached response(s)")
+            self._entries = []
+            self.generation = generation
+
+    def lookup(self, vector: Sequence[float], generation: int) -> Optional[CachedResponse]:
+        """Return the most similar fresh entry above the threshold, or None."""
+        query = self._normalize(vector)
+        now = time.time()
+        with self._lock:
+            self._check_generation(generation)
+            self._entries = [entry for entry in self._entries if now - entry.created_at < self.ttl]
+            if self._entries:
+                scores = np.vstack([entry.vector for entry in self._entries]) @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    entry = self._entries[best]
+                    entry.hits += 1
+                    entry.last_used_at = now
+                    self.hits += 1
+                    return entry
+            self.misses += 1
+            return None
+
+    def store(self, question: str, answer: str, vector: Sequence[float], generation: int) -> None:
+        """Cache `answer` for `question`; ignored if the index changed since the question was embedded."""
+        now = time.time()
+        with self._lock:
+            self._check_generation(generation)
+            if generation != self.generation:
+                return
+            self._entries.append(CachedResponse(question, answer, self._normalize(vector), generation, now, last_used_at=now))
+            if len(self._entries) > self.max_entries:
+                self._entries.remove(min(self._entries, key=lambda entry: entry.last_used_at))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Return overall hit/miss counters and the hits of every entry."""
+        now = time.time()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": [{"question": entry.question, "hits": entry.hits, "age_seconds": round(now - entry.created_at)} for entry in self._entries],
+            }
+
+
+RESPONSE_CACHE = SemanticResponseCache(
+    threshold=settings.RESPONSE_CACHE_THRESHOLD,
+    ttl=settings.RESPONSE_CACHE_TTL,
+    max_entries=settings.RESPONSE_CACHE_SIZE,
+)
+METRICS.register_collector("response_cache", lambda: {key: value for key, value in RESPONSE_CACHE.stats().items() if key != "entries"})
+
+
+def is_faq_only_turn(turn: Sequence[BaseMessage]) -> bool:
+    """True if the turn called the knowledge base and no other tool."""
+    names = {call["name"] for message in turn if isinstance(message, AIMessage) for call in message.tool_calls}
+    return names == {knowledge_base_tool.name}
+
+
+def is_first_question(messages: Sequence[BaseMessage]) -> bool:
+    """True if the thread has a single human message, so its answer does not depend on earlier turns."""
+    return sum(1 for message in messages if isinstance(message, HumanMessage)) == 1
+
+
+def lookup_response(question: str) -> Optional[CachedResponse]:
+    """Look up a cached answer for `question` (blocking: may embed the question)."""
+    store = VECTOR_STORE_PROVIDER.get()
+    return RESPONSE_CACHE.lookup(store.embed_query(question), store.generation)
+
+
+def record_response(question: str, answer: str) -> None:
+    """Cache the answer of a FAQ-only turn (blocking: may embed the question)."""
+    store = VECTOR_STORE_PROVIDER.get()
+    RESPONSE_CACHE.store(question, answer, store.embed_query(question), store.generation)
@@ -2,7 +2,7 @@
 
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from dotenv import find_dotenv, load_dotenv
 from pydantic import model_validator
@@ -19,25 +19,97 @@ class Settings(BaseSettings):
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     GOOGLE_API_KEY: str
 
-    # Mem0 API key
-    MEM0_API_KEY: str
+    # Long-term memory: hosted mem0 or local SQLite + FastEmbed
+    MEMORY_BACKEND: Literal["mem0", "local"] = "mem0"
+    MEM0_API_KEY: Optional[str] = None
+    MEMORY_DB: str = str(BASE_DIR / "memory.db")
+    MEMORY_TOP_K: int = 10
+    MEMORY_WRITE_QUEUE_SIZE: int = 100
+    MEMORY_WRITE_CONCURRENCY: int = 4
+    MEMORY_WRITE_DRAIN_TIMEOUT: float = 30.0  # seconds to flush queued writes on shutdown
 
     # Gmail service
     ACCOUNT_GMAIL: str
     PASSWORD_GMAIL: str
     SMTP_SERVER: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
-
-    # Google Calendar
+    SMTP_TIMEOUT: float = 30.0
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_IDLE_TIMEOUT: float = 240.0
+
+    # Notification outbox
+    OUTBOX_DB: str = str(BASE_DIR / "outbox.db")
+    OUTBOX_BATCH_SIZE: int = 10
+    OUTBOX_MAX_ATTEMPTS: int = 5
+
+    # Calendar: Google Calendar API, or a local SQLite calendar (CALENDAR_DB) with the same interface
+    CALENDAR_BACKEND: Literal["google", "sqlite"] = "google"
+    CALENDAR_DB: str = str(BASE_DIR / "calendar.db")
     CALENDAR_ID: str
     SERVICE_ACCOUNT_FILE: str
     SCOPES_CALENDER: List[str] = ["https://www.googleapis.com/auth/calendar"]
     GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = None
+    CALENDAR_TIMEOUT: float = 30.0
+    CALENDAR_MAX_WORKERS: int = 8
+    CALENDAR_CACHE_TTL: float = 60.0  # seconds, 0 disables the availability cache
 
     # Storage Configuration
     FAISS_INDEX: str = str(BASE_DIR / "fais_index")
     DOCS_PATH: str = str(BASE_DIR / "src" / "agent" / "docs")
 
+    # FAISS index: flat (exact), ivf_flat, ivf_pq or hnsw; the index is rebuilt when this changes
+    FAISS_INDEX_TYPE: Literal["flat", "ivf_flat", "ivf_pq", "hnsw"] = "flat"
+    FAISS_NLIST: int = 0  # IVF lists, 0 picks about 4 * sqrt(chunks)
+    FAISS_NPROBE: int = 8  # IVF lists scanned per query
+    FAISS_PQ_M: int = 16  # PQ sub-quantizers, must divide the embedding dimension
+    FAISS_PQ_NBITS: int = 8
+    FAISS_HNSW_M: int = 32
+    FAISS_EF_CONSTRUCTION: int = 40
+    FAISS_EF_SEARCH: int = 64
+    FAISS_TRAIN_SIZE: int = 20000  # chunks buffered to train IVF indexes, the rest is streamed in
+    # mmap: memory-mapped FAISS file + SQLite docstore read on demand; pickle: langchain save_local/load_local
+    INDEX_FORMAT: Literal["mmap", "pickle"] = "mmap"
+
+    # Knowledge-base retrieval
+    KB_TOP_K: int = 5
+    # fuse BM25 with the FAISS results; with INDEX_FORMAT=mmap the BM25 postings are stored in docstore.db
+    # and read per query, with pickle every worker builds an in-memory BM25 index about the size of the chunk texts
+    KB_HYBRID: bool = True
+    KB_CANDIDATES: int = 20  # results taken from each retriever before fusion and reranking
+    KB_RERANK_MODEL: Optional[str] = None  # FastEmbed cross-encoder, e.g. "Xenova/ms-marco-MiniLM-L-6-v2"
+    KB_QUERY_CACHE_SIZE: int = 1024  # query embedding and top-k result caches, 0 disables
+
+    # Semantic cache of answers to knowledge-base-only turns; answers are reused across users, so it is opt-in
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_THRESHOLD: float = 0.92  # minimum cosine similarity to reuse an answer
+    RESPONSE_CACHE_TTL: float = 86400.0
+    RESPONSE_CACHE_SIZE: int = 512
+
+    # Embedding pipeline for index builds
+    EMBED_BATCH_SIZE: int = 256
+    EMBED_WORKERS: int = 2  # batches embedded concurrently
+    EMBED_THREADS: Optional[int] = None  # ONNX Runtime threads per batch, None lets FastEmbed decide
+
+    # Prompt token budget for call_model; older turns are dropped and summarised to fit
+    CONTEXT_TOKEN_BUDGET: int = 12000
+    CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {}  # per-model overrides, e.g. {"google_genai/gemini-2.5-flash": 32000}
+    CONTEXT_TOOL_RESULT_MAX_CHARS: int = 1500  # tool results of earlier turns are cut to this length
+    MEMORY_CONTEXT_MAX_TOKENS: int = 1000
+
+    # Tool calls of one model step: read-only tools run concurrently, human-reviewed tools one at a time
+    TOOL_MAX_CONCURRENCY: int = 4
+    TOOL_TIMEOUT: float = 30.0  # seconds per call, not applied to human-reviewed tools
+    TOOL_TIMEOUTS: Dict[str, float] = {}  # per-tool overrides, e.g. {"knowledge_base_tool": 10}
+
+    # Stream answer tokens to the `custom` stream channel while the model generates
+    STREAM_RESPONSES: bool = True
+
+    # Chat models with tools bound, cached across graph steps
+    BOUND_MODEL_CACHE_SIZE: int = 8
+
+    # Initialise backends (Calendar, email, memory, vector store) in the background at startup
+    WARM_UP_ON_START: bool = False
+
     LANGSMITH_TRACING_V2: str
     LANGSMITH_PROJECT: str
     LANGSMITH_API_KEY: str
@@ -47,6 +119,12 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         case_sensitive = True
 
+    @model_validator(mode="after")
+    def check_memory_backend(self) -> "Settings":
+        if self.MEMORY_BACKEND == "mem0" and not self.MEM0_API_KEY:
+            raise ValueError("MEM0_API_KEY is required when MEMORY_BACKEND is 'mem0'")
+        return self
+
     @model_validator(mode="after")
     def set_google_credentials(self) -> "Settings":
         if self.SERVICE_ACCOUNT_FILE:
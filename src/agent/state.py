@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Sequence
+from typing import Optional, Sequence
 
 from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
@@ -51,6 +51,17 @@ class State(InputState):
     It is set to 'True' when the step count reaches recursion_limit - 1.
     """
 
+    memory_context: Optional[str] = field(default=None)
+    """
+    Long-term memory retrieved for the current human turn.
+
+    Searched once when a new HumanMessage arrives and reused by the model calls
+    that follow tool executions within the same turn.
+    """
+
+    memory_turn_id: Optional[str] = field(default=None)
+    """ID of the HumanMessage that `memory_context` was retrieved for."""
+
     # Additional attributes can be added here as needed.
     # Common examples include:
     # retrieved_documents: List[Document] = field(default_factory=list)
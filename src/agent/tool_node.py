@@ -0,0 +1,138 @@
+"""Tool node that runs read-only tool calls of one model step concurrently."""
+
+import asyncio
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from langchain_core.messages import ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor, get_config_list
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import ToolNode
+from langgraph.store.base import BaseStore
+from loguru import logger
+
+from src.agent.core.metrics import TOOL_CALLS, TOOL_LATENCY
+
+
+class ParallelToolNode(ToolNode):
+    """
+    ToolNode with a concurrency cap and a timeout per tool call.
+
+    Read-only calls of one step run concurrently (at most `max_concurrency`
+    at a time), so the step takes as long as its slowest call. Tools marked
+    by `human_in_the_loop` then run one after another, in call order: each
+    may interrupt for review, and resuming replays interrupts in order.
+
+    A call that exceeds its timeout is answered with an error ToolMessage so
+    the model can retry or tell the user. In the sync path the timeouts run
+    from the start of the step, so the step waits at most the longest
+    timeout. A timed-out sync tool keeps running in its worker thread until
+    it returns; only the step stops waiting.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[Union[BaseTool, Any]],
+        *,
+        max_concurrency: int = 4,
+        timeout: Optional[float] = 30.0,
+        timeouts: Optional[Dict[str, float]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(tools, **kwargs)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+
+    def _is_serial(self, call: ToolCall) -> bool:
+        tool = self.tools_by_name.get(call["name"])
+        return bool(tool and (tool.metadata or {}).get("hitl"))
+
+    def _timeout_for(self, call: ToolCall) -> Optional[float]:
+        return self.timeouts.get(call["name"], self.timeout)
+
+    @staticmethod
+    def _record(call: ToolCall, output: Any, started: float) -> None:
+        status = getattr(output, "status", "success")
+        TOOL_LATENCY.observe(time.perf_counter() - started, tool=call["name"])
+        TOOL_CALLS.inc(tool=call["name"], status=status)
+
+    def _run_one(self, call: ToolCall, input_type: Any, config: RunnableConfig) -> Any:
+        started = time.perf_counter()
+        output = super()._run_one(call, input_type, config)
+        self._record(call, output, started)
+        return output
+
+    async def _arun_one(self, call: ToolCall, input_type: Any, config: RunnableConfig) -> Any:
+        started = time.perf_counter()
+        output = await super()._arun_one(call, input_type, config)
+        self._record(call, output, started)
+        return output
+
+    @staticmethod
+    def _timeout_message(call: ToolCall, timeout: float) -> ToolMessage:
+        logger.warning(f"Tool {call['name']} timed out after {timeout}s")
+        TOOL_LATENCY.observe(timeout, tool=call["name"])
+        TOOL_CALLS.inc(tool=call["name"], status="timeout")
+        return ToolMessage(
+            content=f"Error: {call['name']} did not respond within {timeout:g} seconds. Please try again.",
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    def _func(self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        # one config per call, as in ToolNode, so each call gets its own run and callbacks
+        configs = get_config_list(config, len(tool_calls))
+        outputs: List[Any] = [None] * len(tool_calls)
+        parallel = [i for i, call in enumerate(tool_calls) if not self._is_serial(call)]
+
+        if parallel:
+            executor = ContextThreadPoolExecutor(max_workers=min(self.max_concurrency, len(parallel)), thread_name_prefix="tool")
+            try:
+                started = time.monotonic()
+                futures = {i: executor.submit(self._run_one, tool_calls[i], input_type, configs[i]) for i in parallel}
+                for i, future in futures.items():
+                    timeout = self._timeout_for(tool_calls[i])
+                    try:
+                        outputs[i] = future.result(timeout=None if timeout is None else max(0.0, started + timeout - time.monotonic()))
+                    except FutureTimeoutError:
+                        outputs[i] = self._timeout_message(tool_calls[i], timeout)
+            finally:
+                # do not wait for timed-out calls
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        for i, call in enumerate(tool_calls):
+            if outputs[i] is None:
+                outputs[i] = self._run_one(call, input_type, configs[i])
+
+        return self._combine_tool_outputs(outputs, input_type)
+
+    async def _afunc(self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        configs = get_config_list(config, len(tool_calls))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_limited(call: ToolCall, call_config: RunnableConfig) -> Any:
+            async with semaphore:
+                timeout = self._timeout_for(call)
+                try:
+                    return await asyncio.wait_for(self._arun_one(call, input_type, call_config), timeout)
+                except asyncio.TimeoutError:
+                    return self._timeout_message(call, timeout)
+
+        parallel = [i for i, call in enumerate(tool_calls) if not self._is_serial(call)]
+        results = await asyncio.gather(*(run_limited(tool_calls[i], configs[i]) for i in parallel))
+        outputs: List[Any] = [None] * len(tool_calls)
+        for i, result in zip(parallel, results):
+            outputs[i] = result
+
+        for i, call in enumerate(tool_calls):
+            if outputs[i] is None:
+                # no timeout: the call may be waiting on a human review
+                outputs[i] = await self._arun_one(call, input_type, configs[i])
+
+        return self._combine_tool_outputs(outputs, input_type)
@@ -1,4 +1,5 @@
+from .bulk import TOOLS_CALENDAR_BULK
 from .tool_retriever import TOOLS_KNOWLEDGE_BASE
 from .tools_calendar import TOOLS_CALENDAR
 
-__all__ = ["TOOLS_KNOWLEDGE_BASE", "TOOLS_CALENDAR"]
+__all__ = ["TOOLS_KNOWLEDGE_BASE", "TOOLS_CALENDAR", "TOOLS_CALENDAR_BULK"]
@@ -0,0 +1,235 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytz
+from googleapiclient.errors import HttpError
+from loguru import logger
+
+from src.agent.core import EVENT_CACHE, execute_batch, get_calendar_service, get_email_service
+from src.agent.core.calendar_cache import event_bounds
+from src.agent.hitl import human_in_the_loop
+from src.agent.model import CancelAppointment, UpdateAppointment
+from src.agent.setting import settings
+
+from .helper import calendar_tool, is_within_doctor_schedule, list_all_events, patch_event_request
+from .schema import InputBulkCancelAppointments, InputBulkRescheduleAppointments, RescheduleItem
+
+
+def parse_appointment_description(description: str) -> Dict[str, str]:
+    """Read the `Key: value` lines written by `create_doctor_appointment`."""
+    fields = {}
+    for line in (description or "").splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+def _format_start(event: Dict) -> str:
+    start, _ = event_bounds(event)
+    if start is None:
+        return ""
+    return start.astimezone(pytz.timezone("Asia/Jakarta")).strftime("%d %B %Y, %H:%M WIB")
+
+
+def _queue_notifications(results: List[Dict[str, Any]], notifications: List[Tuple[int, str, Any]]) -> None:
+    """Queue all notification emails in one outbox transaction and attach their IDs."""
+    if not notifications:
+        return
+    ids = get_email_service().queue_many([(kind, data) for _, kind, data in notifications])
+    for (index, _, _), notification_id in zip(notifications, ids):
+        results[index]["notification_id"] = notification_id
+
+
+def cancel_events(events: List[Dict], reason: str) -> List[Dict[str, Any]]:
+    """
+    Delete events with one batch request and notify their patients.
+
+    Args:
+        events: Raw Calendar events to delete.
+        reason: Cancellation reason included in the emails.
+
+    Returns:
+        One result per event with `event_id`, `success`, `notification_id`
+        and `message`.
+    """
+    requests = [(event["id"], get_calendar_service().events().delete(calendarId=settings.CALENDAR_ID, eventId=event["id"])) for event in events]
+    responses = execute_batch(requests)
+
+    results: List[Dict[str, Any]] = []
+    notifications: List[Tuple[int, str, Any]] = []
+    for event in events:
+        _, error = responses.get(event["id"], (None, RuntimeError("No response in batch")))
+        if error is not None:
+            results.append({"event_id": event["id"], "success": False, "notification_id": None, "message": f"Error delete appointment: {error}"})
+            continue
+
+        EVENT_CACHE.invalidate(event_id=event["id"])
+        results.append({"event_id": event["id"], "success": True, "notification_id": None, "message": "Appointment deleted"})
+
+        patient = parse_appointment_description(event.get("description", ""))
+        if patient.get("Patient Email"):
+            notifications.append(
+                (
+                    len(results) - 1,
+                    "appointment_cancelled",
+                    CancelAppointment(
+                        patient_name=patient.get("Patient Name", ""),
+                        patient_email=patient["Patient Email"],
+                        event_id=event["id"],
+                        appointment_datetime=_format_start(event),
+                        appointment_type=patient.get("Appointment Type", ""),
+                        reason=reason,
+                    ),
+                )
+            )
+
+    _queue_notifications(results, notifications)
+    return results
+
+
+def bulk_reschedule_appointments(changes: List[RescheduleItem], timezone: str = "Asia/Jakarta") -> List[Dict[str, Any]]:
+    """
+    Move appointments with one batch of partial updates and notify their patients.
+
+    Args:
+        changes: New start (and optionally end) time per event; when no end is
+            given the appointment keeps its current duration, read with one
+            batch of gets, and the update only succeeds while the event is
+            unchanged since.
+        timezone: Timezone of the given times.
+
+    Returns:
+        One result per change with `event_id`, `success`, `notification_id`
+        and `message`.
+    """
+    tz = pytz.timezone(timezone)
+    to_fetch = list(dict.fromkeys(change.event_id for change in changes if not change.end_datetime))
+    current = execute_batch([(event_id, get_calendar_service().events().get(calendarId=settings.CALENDAR_ID, eventId=event_id)) for event_id in to_fetch]) if to_fetch else {}
+
+    results: List[Dict[str, Any]] = []
+    requests = []
+    for change in changes:
+        start = tz.localize(change.start_datetime)
+        etag = None
+        if change.end_datetime:
+            end = tz.localize(change.end_datetime)
+        else:
+            event, error = current.get(change.event_id, (None, RuntimeError("No response in batch")))
+            if error is not None:
+                results.append({"event_id": change.event_id, "success": False, "notification_id": None, "message": f"Error get event: {error}"})
+                continue
+            event_start, event_end = event_bounds(event)
+            end = start + (event_end - event_start if event_start else timedelta(minutes=30))
+            etag = event.get("etag")
+        try:
+            is_within_doctor_schedule(start, int((end - start).total_seconds() / 60))
+        except Exception as e:
+            results.append({"event_id": change.event_id, "success": False, "notification_id": None, "message": str(e)})
+            continue
+
+        body = {
+            "start": {"dateTime": start.isoformat(), "timeZone": timezone},
+            "end": {"dateTime": end.isoformat(), "timeZone": timezone},
+        }
+        results.append({"event_id": change.event_id, "success": None, "notification_id": None, "message": ""})
+        requests.append((str(len(results) - 1), patch_event_request(change.event_id, body, etag=etag)))
+
+    responses = execute_batch(requests) if requests else {}
+
+    notifications: List[Tuple[int, str, Any]] = []
+    for request_id, _ in requests:
+        index = int(request_id)
+        event, error = responses.get(request_id, (None, RuntimeError("No response in batch")))
+        if error is not None:
+            results[index].update(success=False, message=f"Error update appointment: {error}")
+            continue
+
+        start, end = event_bounds(event)
+        EVENT_CACHE.invalidate(event_id=event["id"], start=start, end=end)
+        results[index].update(success=True, message="Appointment rescheduled")
+
+        patient = parse_appointment_description(event.get("description", ""))
+        if patient.get("Patient Email"):
+            notifications.append(
+                (
+                    index,
+                    "appointment_updated",
+                    UpdateAppointment(
+                        patient_name=patient.get("Patient Name", ""),
+                        patient_email=patient["Patient Email"],
+                        title=event.get("summary", ""),
+                        new_datetime=_format_start(event),
+                        description=event.get("description", ""),
+                        location=event.get("location", ""),
+                    ),
+                )
+            )
+
+    _queue_notifications(results, notifications)
+    return results
+
+
+def _summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    succeeded = sum(1 for r in results if r["success"])
+    return {
+        "success": succeeded == len(results),
+        "results": results,
+        "message": f"{succeeded} of {len(results)} appointment(s) processed successfully",
+    }
+
+
+@calendar_tool("bulk_cancel_doctor_appointments", args_schema=InputBulkCancelAppointments)
+def bulk_cancel_doctor_appointments(
+    start_datetime: datetime,
+    end_datetime: datetime,
+    reason: str,
+) -> Dict[str, Any]:
+    """
+    Use this tool to cancel every appointment in a time range at once,
+    e.g. when the doctor is unavailable for a whole session. Patients are notified by email.
+    Other events in the range are left in place and reported as skipped.
+    """
+    try:
+        logger.info("Using tools bulk_cancel_doctor_appointments...")
+        tz = pytz.timezone("Asia/Jakarta")
+        # not from the cache: every appointment booked up to now must be found
+        events = list_all_events(tz.localize(start_datetime), tz.localize(end_datetime))
+        appointments, skipped = [], []
+        for event in events:
+            if "Patient Email" in parse_appointment_description(event.get("description", "")):
+                appointments.append(event)
+            else:
+                skipped.append({"event_id": event["id"], "title": event.get("summary", "")})
+
+        summary = _summarize(cancel_events(appointments, reason))
+        summary["skipped"] = skipped
+        if skipped:
+            summary["message"] += f"; {len(skipped)} event(s) without a patient were not cancelled"
+        return summary
+
+    except HttpError as error:
+        logger.error(f"Error bulk_cancel_doctor_appointments: {error}")
+        return {"success": False, "results": [], "skipped": [], "message": f"Error bulk cancel appointments: {error}"}
+
+
+@calendar_tool("bulk_reschedule_doctor_appointments", args_schema=InputBulkRescheduleAppointments)
+def bulk_reschedule_doctor_appointments(changes: List[RescheduleItem]) -> Dict[str, Any]:
+    """
+    Use this tool to move several appointments to new times at once.
+    Patients are notified by email.
+    """
+    try:
+        logger.info("Using tools bulk_reschedule_doctor_appointments...")
+        return _summarize(bulk_reschedule_appointments(changes))
+
+    except HttpError as error:
+        logger.error(f"Error bulk_reschedule_doctor_appointments: {error}")
+        return {"success": False, "results": [], "message": f"Error bulk reschedule appointments: {error}"}
+
+
+# Admin tools, not bound to the patient-facing agent by default
+TOOLS_CALENDAR_BULK: List[Callable[..., Any]] = [
+    human_in_the_loop(bulk_cancel_doctor_appointments),
+    human_in_the_loop(bulk_reschedule_doctor_appointments),
+]
@@ -0,0 +1,146 @@
+import json
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+from .hybrid import bm25_scores, tokenize
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS index_map (
+    position INTEGER PRIMARY KEY,
+    doc_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS doc_lengths (
+    doc_id TEXT PRIMARY KEY,
+    length INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    Chunk texts and metadata stored in SQLite and read on demand.
+
+    Unlike the pickled InMemoryDocstore, nothing is loaded up front: each
+    worker process only reads the chunks it returns, from a file the OS page
+    cache shares between processes. The FAISS position -> chunk ID mapping and
+    the BM25 postings are kept in the same file, so keyword search reads the
+    postings of the query terms instead of every chunk.
+
+    A docstore that other processes read is never modified in place: changes
+    go to a `copy` that then replaces the file, like `index.faiss`. Readers
+    keep the file they opened, so it uses a rollback journal rather than WAL,
+    whose side files are named after the path and would outlive the swap.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def copy(self, db_path: str) -> "SQLiteDocstore":
+        """Write a copy of this docstore to `db_path`, replacing any file there, and open it."""
+        Path(db_path).unlink(missing_ok=True)
+        target = sqlite3.connect(db_path)
+        with self._lock:
+            self._conn.backup(target)
+        target.execute("PRAGMA journal_mode=DELETE")
+        target.close()
+        return SQLiteDocstore(db_path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        rows = [(doc_id, doc.page_content, json.dumps(doc.metadata)) for doc_id, doc in texts.items()]
+        postings, lengths = [], []
+        for doc_id, doc in texts.items():
+            tokens = tokenize(doc.page_content)
+            postings += [(term, doc_id, tf) for term, tf in Counter(tokens).items()]
+            lengths.append((doc_id, len(tokens)))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO documents (id, text, metadata) VALUES (?, ?, ?)", rows)
+            self._conn.executemany("DELETE FROM postings WHERE doc_id = ?", [(doc_id,) for doc_id in texts])
+            self._conn.executemany("INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)", postings)
+            self._conn.executemany("INSERT OR REPLACE INTO doc_lengths (doc_id, length) VALUES (?, ?)", lengths)
+            self._conn.execute("COMMIT")
+
+    def search(self, search: str) -> Union[str, Document]:
+        with self._lock:
+            row = self._conn.execute("SELECT text, metadata FROM documents WHERE id = ?", (search,)).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=row[0], metadata=json.loads(row[1]))
+
+    def delete(self, ids: List) -> None:
+        rows = [(doc_id,) for doc_id in ids]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM documents WHERE id = ?", rows)
+            self._conn.executemany("DELETE FROM postings WHERE doc_id = ?", rows)
+            self._conn.executemany("DELETE FROM doc_lengths WHERE doc_id = ?", rows)
+            self._conn.execute("COMMIT")
+
+    def has_postings(self) -> bool:
+        """False for a docstore written before BM25 postings were stored, which must be rebuilt."""
+        with self._lock:
+            has_documents = self._conn.execute("SELECT EXISTS (SELECT 1 FROM documents)").fetchone()[0]
+            has_lengths = self._conn.execute("SELECT EXISTS (SELECT 1 FROM doc_lengths)").fetchone()[0]
+        return bool(has_lengths or not has_documents)
+
+    def bm25_search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """Return up to `k` (doc_id, score) pairs, best first, reading only the postings of the query terms."""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        placeholders = ", ".join("?" * len(terms))
+        with self._lock:
+            n_docs, total_length = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM doc_lengths").fetchone()
+            rows = self._conn.execute(
+                f"SELECT p.term, p.doc_id, p.tf, l.length FROM postings p JOIN doc_lengths l ON l.doc_id = p.doc_id WHERE p.term IN ({placeholders})",
+                terms,
+            ).fetchall()
+        if not rows:
+            return []
+
+        postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        lengths: Dict[str, int] = {}
+        for term, doc_id, tf, length in rows:
+            postings[term][doc_id] = tf
+            lengths[doc_id] = length
+        scores = bm25_scores(postings, lengths, n_docs, total_length / n_docs)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def load_index_map(self) -> Dict[int, str]:
+        """Return the FAISS position -> chunk ID mapping."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT position, doc_id FROM index_map").fetchall())
+
+    def save_index_map(self, index_to_docstore_id: Dict[int, str]) -> None:
+        """Replace the FAISS position -> chunk ID mapping."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM index_map")
+            self._conn.executemany("INSERT INTO index_map (position, doc_id) VALUES (?, ?)", index_to_docstore_id.items())
+            self._conn.execute("COMMIT")
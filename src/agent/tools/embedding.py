@@ -0,0 +1,80 @@
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+
+# (chunk ID, chunk) pairs in, (IDs, chunks, vectors) batches out
+Batch = Tuple[List[str], List[Document], np.ndarray]
+
+
+def embedding_dimension(embeddings: Embeddings) -> int:
+    """
+    Return the vector size of an embedding model.
+
+    FastEmbed models are looked up in the model registry, so no text has to
+    be embedded; other models fall back to embedding a probe text.
+    """
+    model_name = getattr(embeddings, "model_name", None)
+    if model_name:
+        from fastembed import TextEmbedding
+
+        for model in TextEmbedding.list_supported_models():
+            if model["model"].lower() == model_name.lower():
+                return int(model["dim"])
+    return len(embeddings.embed_query("hello world"))
+
+
+def embed_batches(
+    embeddings: Embeddings,
+    chunks: Iterable[Tuple[str, Document]],
+    batch_size: int = 256,
+    workers: int = 2,
+) -> Iterator[Batch]:
+    """
+    Embed a stream of chunks in batches on a worker pool.
+
+    The input is consumed lazily and at most `2 * workers` batches are in
+    flight, so memory stays bounded however large the corpus is. ONNX Runtime
+    releases the GIL while a batch runs, so the workers embed in parallel.
+    Batches are yielded in input order as soon as they are ready.
+
+    Args:
+        embeddings: Model used to embed the chunk texts.
+        chunks: (chunk ID, chunk) pairs.
+        batch_size: Chunks per embedding call.
+        workers: Batches embedded concurrently.
+
+    Yields:
+        Batch: The IDs, chunks and float32 vectors of one batch.
+    """
+    chunks = iter(chunks)
+    done, start = 0, time.perf_counter()
+
+    def _embed(batch: List[Tuple[str, Document]]) -> Batch:
+        ids = [chunk_id for chunk_id, _ in batch]
+        docs = [doc for _, doc in batch]
+        vectors = np.asarray(embeddings.embed_documents([doc.page_content for doc in docs]), dtype=np.float32)
+        return ids, docs, vectors
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as pool:
+        in_flight: Deque[Future] = deque()
+        while True:
+            while len(in_flight) < 2 * workers:
+                batch = list(islice(chunks, batch_size))
+                if not batch:
+                    break
+                in_flight.append(pool.submit(_embed, batch))
+            if not in_flight:
+                break
+
+            result = in_flight.popleft().result()
+            done += len(result[0])
+            elapsed = time.perf_counter() - start
+            logger.info(f"Embedded {done} chunks ({done / elapsed:.0f} chunks/s)")
+            yield result
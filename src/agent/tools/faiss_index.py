@@ -0,0 +1,103 @@
+import math
+from typing import Optional
+
+import faiss
+import numpy as np
+from loguru import logger
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+TRAINED_INDEX_TYPES = ("ivf_flat", "ivf_pq")
+
+# k-means wants roughly this many training points per centroid
+TRAINING_POINTS_PER_CENTROID = 39
+
+
+def default_nlist(n_vectors: int) -> int:
+    """Pick the number of IVF lists for `n_vectors`: about 4 * sqrt(n), bounded by the training data."""
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // TRAINING_POINTS_PER_CENTROID))
+
+
+def build_index(
+    vectors: np.ndarray,
+    index_type: str = "flat",
+    nlist: Optional[int] = None,
+    pq_m: int = 16,
+    pq_nbits: int = 8,
+    hnsw_m: int = 32,
+    ef_construction: int = 40,
+) -> faiss.Index:
+    """
+    Create an empty L2 index of `index_type`, trained on `vectors` if needed.
+
+    - flat: exact brute-force search, the baseline.
+    - ivf_flat: inverted lists over k-means cells; only `nprobe` cells are scanned.
+    - ivf_pq: inverted lists with product-quantised codes of `pq_m` bytes
+      per vector (at 8 bits), a fraction of the float32 size.
+    - hnsw: graph-based search, no training needed.
+
+    Args:
+        vectors: Training vectors of shape (n, dim); usually the vectors to be indexed.
+        index_type: One of `INDEX_TYPES`.
+        nlist: Number of IVF lists; `default_nlist` when None.
+        pq_m: Number of PQ sub-quantizers, must divide the dimension.
+        pq_nbits: Bits per PQ code; lowered when there are too few vectors to train.
+        hnsw_m: Neighbours per HNSW node.
+        ef_construction: HNSW build-time search depth.
+
+    Returns:
+        faiss.Index: The trained, empty index; vectors still have to be added.
+
+    Raises:
+        ValueError: If the index type is unknown or `pq_m` does not divide the dimension.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n_vectors, dim = vectors.shape
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+        return index
+
+    if index_type == "flat" or n_vectors < 2:
+        if index_type != "flat":
+            logger.warning(f"Only {n_vectors} vector(s), too few to train {index_type}; using a flat index")
+        return faiss.IndexFlatL2(dim)
+
+    nlist = min(nlist or default_nlist(n_vectors), n_vectors)
+    quantizer = faiss.IndexFlatL2(dim)
+    if index_type == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+    else:
+        if dim % pq_m:
+            raise ValueError(f"FAISS_PQ_M={pq_m} must divide the embedding dimension {dim}")
+        nbits = min(pq_nbits, int(math.log2(n_vectors)))
+        if nbits < pq_nbits:
+            logger.warning(f"Only {n_vectors} vectors, using {nbits}-bit PQ codes instead of {pq_nbits}")
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, nbits)
+
+    index.train(vectors)
+    logger.info(f"Trained {index_type} index with {nlist} lists on {n_vectors} vectors")
+    return index
+
+
+def set_search_params(index: faiss.Index, nprobe: int = 8, ef_search: int = 64) -> None:
+    """Apply query-time tuning: `nprobe` for IVF indexes, `efSearch` for HNSW."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """Return the `INDEX_TYPES` name of a loaded index."""
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVFFlat):
+        return "ivf_flat"
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    return "flat"
@@ -1,11 +1,15 @@
 from datetime import datetime, time, timedelta
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Type
 
 import pytz
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+from langchain_core.tools import StructuredTool
 from loguru import logger
+from pydantic import BaseModel
 
-from src.agent.core import CALENDAR_SERVICE
+from src.agent.core import EVENT_CACHE, execute_request, get_calendar_service, run_in_calendar_executor
+from src.agent.core.calendar_cache import event_bounds
 from src.agent.setting import settings
 from src.agent.utils import format_event_details
 
@@ -20,6 +24,29 @@ DOCTOR_SCHEDULE = {
 }
 
 
+def calendar_tool(name: str, args_schema: Type[BaseModel]) -> Callable[[Callable[..., Any]], StructuredTool]:
+    """
+    Decorator like `@tool` for functions that call the Calendar API.
+
+    Besides the sync function, the tool gets an async variant that runs the
+    function on the calendar thread pool, so `ainvoke` from the graph never
+    blocks the event loop on a Calendar request.
+    """
+
+    def decorator(func: Callable[..., Any]) -> StructuredTool:
+        async def coroutine(**kwargs: Any) -> Any:
+            return await run_in_calendar_executor(func, **kwargs)
+
+        return StructuredTool.from_function(
+            func=func,
+            coroutine=coroutine,
+            name=name,
+            args_schema=args_schema,
+        )
+
+    return decorator
+
+
 class ScheduleValidationError(Exception):
     """Custom exception for schedule validation errors"""
 
@@ -86,6 +113,122 @@ def is_within_doctor_schedule(appointment_datetime: datetime, duration_minutes:
     return True
 
 
+def list_events(time_min: datetime, time_max: datetime, max_results: int = 30) -> List[Dict[str, Any]]:
+    """
+    List events overlapping a time window, ordered by start time.
+
+    Results are served from `EVENT_CACHE` when a cached window covers the
+    requested range; otherwise the Calendar API is called and the result cached.
+
+    Args:
+        time_min: Timezone-aware start of the window.
+        time_max: Timezone-aware end of the window.
+        max_results: Maximum number of events to return.
+
+    Returns:
+        A list of raw Google Calendar events.
+
+    Raises:
+        HttpError: If the Calendar API request fails.
+    """
+    cached = EVENT_CACHE.get(time_min, time_max, max_results)
+    if cached is not None:
+        logger.debug("Calendar events served from cache")
+        return cached
+
+    generation = EVENT_CACHE.generation
+    event_results = execute_request(
+        get_calendar_service()
+        .events()
+        .list(
+            calendarId=settings.CALENDAR_ID,
+            timeMin=time_min.isoformat(),
+            timeMax=time_max.isoformat(),
+            maxResults=max_results,
+            singleEvents=True,
+            orderBy="startTime",
+        )
+    )
+
+    events = event_results.get("items", [])
+    EVENT_CACHE.put(time_min, time_max, events, complete="nextPageToken" not in event_results, generation=generation)
+    return events
+
+
+def list_all_events(time_min: datetime, time_max: datetime) -> List[Dict[str, Any]]:
+    """
+    List every event overlapping a time window, straight from the Calendar API.
+
+    Unlike `list_events`, `EVENT_CACHE` is bypassed and every page is read,
+    for callers that act on all events in the window.
+
+    Args:
+        time_min: Timezone-aware start of the window.
+        time_max: Timezone-aware end of the window.
+
+    Returns:
+        A list of raw Google Calendar events, ordered by start time.
+
+    Raises:
+        HttpError: If a Calendar API request fails.
+    """
+    params = {
+        "calendarId": settings.CALENDAR_ID,
+        "timeMin": time_min.isoformat(),
+        "timeMax": time_max.isoformat(),
+        "maxResults": 250,
+        "singleEvents": True,
+        "orderBy": "startTime",
+    }
+    events: List[Dict[str, Any]] = []
+    while True:
+        event_results = execute_request(get_calendar_service().events().list(**params))
+        events.extend(event_results.get("items", []))
+        if "nextPageToken" not in event_results:
+            return events
+        params["pageToken"] = event_results["nextPageToken"]
+
+
+def patch_event_request(event_id: str, changes: Dict[str, Any], etag: Optional[str] = None) -> HttpRequest:
+    """
+    Build a partial-update request that sends only the changed fields.
+
+    Args:
+        event_id: ID of the event to update.
+        changes: Event fields to overwrite, e.g. {"summary": ..., "start": {...}}.
+        etag: If given, the update only succeeds while the event still has
+            this ETag; otherwise the API answers 412 Precondition Failed.
+
+    Returns:
+        The request, to execute directly or add to a batch.
+    """
+    request = get_calendar_service().events().patch(calendarId=settings.CALENDAR_ID, eventId=event_id, body=changes)
+    if etag:
+        request.headers["If-Match"] = etag
+    return request
+
+
+def patch_event(event_id: str, changes: Dict[str, Any], etag: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Apply a partial update to an event in a single API call.
+
+    Args:
+        event_id: ID of the event to update.
+        changes: Event fields to overwrite.
+        etag: Optional ETag guard, see `patch_event_request`.
+
+    Returns:
+        The full updated event.
+
+    Raises:
+        HttpError: If the update fails, with status 412 on an ETag conflict.
+    """
+    event = execute_request(patch_event_request(event_id, changes, etag))
+    start, end = event_bounds(event)
+    EVENT_CACHE.invalidate(event_id=event_id, start=start, end=end)
+    return event
+
+
 def create_event(
     title: str,
     start_datetime: datetime,
@@ -128,15 +271,16 @@ def create_event(
             "end": {"dateTime": end_datetime.isoformat(), "timeZone": timezone},
         }
 
-        event = (
-            CALENDAR_SERVICE.events()
+        event = execute_request(
+            get_calendar_service()
+            .events()
             .insert(
                 calendarId=settings.CALENDAR_ID,
                 body=event_body,
             )
-            .execute()
         )
 
+        EVENT_CACHE.invalidate(start=start_datetime, end=end_datetime)
         formatted_event = format_event_details(event)
 
         return {
@@ -0,0 +1,129 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; keeps digits, so codes like `A09` or `BPJS` match exactly."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def bm25_scores(
+    postings: Dict[str, Dict[str, int]],
+    lengths: Dict[str, int],
+    n_docs: int,
+    avg_length: float,
+    k1: float = 1.5,
+    b: float = 0.75,
+) -> Dict[str, float]:
+    """
+    Okapi BM25 score of every document matching at least one query term.
+
+    Args:
+        postings: For each distinct query term, the term frequency by document ID.
+        lengths: Token count of every document in `postings`.
+        n_docs: Number of documents in the corpus.
+        avg_length: Average document length in the corpus.
+
+    Returns:
+        The score by document ID.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for term_postings in postings.values():
+        idf = math.log(1 + (n_docs - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+        for doc_id, tf in term_postings.items():
+            norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+            scores[doc_id] += idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 index over chunk texts.
+
+    Complements the dense index with exact term matching (drug names,
+    service codes) that embeddings of short chunks tend to blur.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._terms: Dict[str, List[str]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index `text` under `doc_id`, replacing any previous text."""
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        for term, count in counts.items():
+            self._postings[term][doc_id] = count
+        self._terms[doc_id] = list(counts)
+        self._lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        """Drop `doc_id` from the index."""
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._terms.pop(doc_id):
+            del self._postings[term][doc_id]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """Return up to `k` (doc_id, score) pairs, best first."""
+        if not self._lengths:
+            return []
+
+        postings = {term: self._postings[term] for term in set(tokenize(query)) if term in self._postings}
+        scores = bm25_scores(postings, self._lengths, len(self._lengths), self._total_length / len(self._lengths), self.k1, self.b)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse several rankings of IDs with reciprocal-rank fusion.
+
+    Each ID scores `sum(1 / (k + rank))` over the rankings it appears in, so
+    results found by both retrievers rise to the top without having to make
+    BM25 and vector scores comparable.
+
+    Args:
+        rankings: ID lists, best first.
+        k: Damping constant; 60 is the value from the original RRF paper.
+
+    Returns:
+        (id, score) pairs, best first.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class CrossEncoderReranker:
+    """Rerank candidates with a FastEmbed cross-encoder that scores (query, chunk) pairs jointly."""
+
+    def __init__(self, model_name: str):
+        # imported here: only needed when reranking is enabled
+        from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+        self.model = TextCrossEncoder(model_name=model_name)
+
+    def rerank(self, query: str, texts: Sequence[str]) -> List[int]:
+        """Return the indexes of `texts`, most relevant first."""
+        scores = list(self.model.rerank(query, texts))
+        return sorted(range(len(texts)), key=lambda i: scores[i], reverse=True)
@@ -0,0 +1,93 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, List, Optional, TypeVar
+
+from langchain_core.documents import Document
+
+from src.agent.core import METRICS
+from src.agent.setting import settings
+
+V = TypeVar("V")
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, whitespace and trailing punctuation so trivially different phrasings share an entry."""
+    return re.sub(r"\s+", " ", query).strip().strip("?!.").strip().lower()
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: V) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._items), "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+
+class QueryCache:
+    """
+    Caches for the knowledge-base search path.
+
+    Query embeddings depend only on the embedding model, so they survive
+    index rebuilds. Top-k results are tagged with the index generation they
+    were computed against and are dropped as soon as the index changes.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.embeddings: LRUCache[List[float]] = LRUCache(max_size)
+        self.results: LRUCache[List[Document]] = LRUCache(max_size)
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def get_results(self, query: str, k: int, generation: int) -> Optional[List[Document]]:
+        self._check_generation(generation)
+        return self.results.get((query, k))
+
+    def put_results(self, query: str, k: int, generation: int, docs: List[Document]) -> None:
+        # a result computed against an older index must not be stored
+        if generation == self.generation:
+            self.results.put((query, k), docs)
+
+    def _check_generation(self, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                self.generation = generation
+                self.results.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return hit/miss counters and sizes of both caches."""
+        return {"embeddings": self.embeddings.stats(), "results": self.results.stats()}
+
+
+QUERY_CACHE: QueryCache = QueryCache(max_size=settings.KB_QUERY_CACHE_SIZE)
+METRICS.register_collector("kb_query_cache", QUERY_CACHE.stats)
@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -15,6 +15,14 @@ class InputGetDoctorSchedule(BaseModel):
     )
 
 
+class InputGetAvailableSlots(BaseModel):
+    """Input model for finding free appointment slots"""
+
+    start_date: date = Field(description="First date to search for free slots (format: YYYY-MM-DD)")
+    end_date: date = Field(description="Last date to search for free slots, inclusive (format: YYYY-MM-DD, at most 14 days after start_date)")
+    duration_minutes: int = Field(default=30, description="Duration of the appointment in minutes (default: 30 minutes)")
+
+
 class InputGetEventById(BaseModel):
     """Input model to retrieve event details by ID"""
 
@@ -48,7 +56,7 @@ class InputUpdateAppointment(BaseModel):
         description="New title for the event (optional, leave blank if not changed)",
     )
     start_datetime: Optional[datetime] = Field(default=None, description="New start time for event (optional)")
-    end_datetime: Optional[datetime] = Field(default=None, description="New end time for event (optional)")
+    end_datetime: Optional[datetime] = Field(default=None, description="New end time for event (optional, the current duration is kept when only the start changes)")
     description: Optional[str] = Field(default=None, description="New description for event (optional)")
     location: Optional[str] = Field(default=None, description="New location for the event (optional)")
 
@@ -64,6 +72,28 @@ class InputCancelAppointment(BaseModel):
     appointment_type: str = Field(description="Type of the appointment")
 
 
+class InputBulkCancelAppointments(BaseModel):
+    """Input model for cancelling all appointments in a time range"""
+
+    start_datetime: datetime = Field(description="Start of the range to cancel (format: YYYY-MM-DD HH:MM:SS)")
+    end_datetime: datetime = Field(description="End of the range to cancel (format: YYYY-MM-DD HH:MM:SS)")
+    reason: str = Field(description="Reason for cancelling the appointments")
+
+
+class RescheduleItem(BaseModel):
+    """New time for one appointment"""
+
+    event_id: str = Field(description="Unique ID of the event to be moved")
+    start_datetime: datetime = Field(description="New start time (format: YYYY-MM-DD HH:MM:SS)")
+    end_datetime: Optional[datetime] = Field(default=None, description="New end time (optional, the current duration is kept when omitted)")
+
+
+class InputBulkRescheduleAppointments(BaseModel):
+    """Input model for moving several appointments at once"""
+
+    changes: List[RescheduleItem] = Field(description="New time for each appointment to be moved")
+
+
 class InputKnowledgeBase(BaseModel):
     """Input model for querying the knowledge base."""
 
@@ -0,0 +1,107 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytz
+
+from src.agent.core.calendar_cache import event_bounds
+
+from .helper import DOCTOR_SCHEDULE
+
+Interval = Tuple[datetime, datetime]
+
+
+def busy_intervals(events: Iterable[Dict]) -> List[Interval]:
+    """Extract the intervals blocked by raw Calendar events."""
+    intervals = []
+    for event in events:
+        if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+            continue
+        start, end = event_bounds(event)
+        if start is not None and end > start:
+            intervals.append((start, end))
+    return intervals
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals by start and merge the overlapping or touching ones."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def compute_free_slots(
+    start_date: date,
+    end_date: date,
+    busy: Iterable[Interval],
+    duration_minutes: int = 30,
+    schedule: Dict[int, Optional[Tuple[time, time]]] = DOCTOR_SCHEDULE,
+    timezone: str = "Asia/Jakarta",
+    not_before: Optional[datetime] = None,
+) -> List[Interval]:
+    """
+    Compute free appointment slots with a sorted-interval sweep.
+
+    Slots are laid on a grid of `duration_minutes` starting at the beginning of
+    each working window from `schedule`, and a slot is free when it does not
+    overlap any busy interval. Because both the days and the merged busy
+    intervals are visited in order, the sweep is linear in their number.
+
+    Args:
+        start_date: First day to search (inclusive).
+        end_date: Last day to search (inclusive).
+        busy: Timezone-aware booked intervals.
+        duration_minutes: Length of each slot.
+        schedule: Working hours per weekday (0 = Monday), None for days off.
+        timezone: Timezone the working hours are expressed in.
+        not_before: Skip slots starting before this moment (e.g. now).
+
+    Returns:
+        Free (start, end) slots in chronological order.
+
+    Raises:
+        ValueError: If duration_minutes is not positive.
+    """
+    if duration_minutes <= 0:
+        raise ValueError("Duration must be positive")
+
+    tz = pytz.timezone(timezone)
+    step = timedelta(minutes=duration_minutes)
+    busy_sorted = merge_intervals(busy)
+
+    slots: List[Interval] = []
+    i = 0
+    for offset in range((end_date - start_date).days + 1):
+        current = start_date + timedelta(days=offset)
+        hours = schedule.get(current.weekday())
+        if not hours:
+            continue
+
+        window_start = tz.localize(datetime.combine(current, hours[0]))
+        window_end = tz.localize(datetime.combine(current, hours[1]))
+
+        # busy intervals that ended before this window can never matter again
+        while i < len(busy_sorted) and busy_sorted[i][1] <= window_start:
+            i += 1
+
+        cursor = window_start
+        if not_before is not None and not_before > cursor:
+            # round up to the next grid point
+            cursor = window_start + -((window_start - not_before) // step) * step
+
+        j = i
+        while cursor + step <= window_end:
+            # skip busy intervals that end before the candidate slot
+            while j < len(busy_sorted) and busy_sorted[j][1] <= cursor:
+                j += 1
+            if j < len(busy_sorted) and busy_sorted[j][0] < cursor + step:
+                # overlap: jump to the first grid point after this busy interval
+                cursor = window_start + -((window_start - busy_sorted[j][1]) // step) * step
+                continue
+            slots.append((cursor, cursor + step))
+            cursor += step
+
+    return slots
@@ -1,24 +1,56 @@
+import hashlib
+import itertools
+import json
+import os
+import threading
 from pathlib import Path
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import faiss
+import numpy as np
 from langchain_community.docstore.in_memory import InMemoryDocstore
-from langchain_community.document_loaders import UnstructuredMarkdownLoader
+from langchain_community.document_loaders import TextLoader, UnstructuredMarkdownLoader
 from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
 from langchain_core.tools import tool
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from loguru import logger
 
+from src.agent.core import Lazy
 from src.agent.setting import settings
 
+from .docstore import SQLiteDocstore
+from .embedding import Batch, embed_batches, embedding_dimension
+from .faiss_index import TRAINED_INDEX_TYPES, build_index, index_type_of, set_search_params
+from .hybrid import BM25Index, CrossEncoderReranker, reciprocal_rank_fusion
+from .query_cache import QUERY_CACHE, normalize_query
 from .schema import InputKnowledgeBase
 
+MANIFEST_FILE = "manifest.json"
+
+# loader per supported file extension under DOCS_PATH
+LOADERS = {
+    ".md": UnstructuredMarkdownLoader,
+    ".txt": TextLoader,
+}
+
+# shared by all retriever instances, so a new instance never reuses an old generation
+INDEX_GENERATIONS = itertools.count(1)
+
+# trained (IVF) indexes are rebuilt once the corpus outgrows the data they were trained on by this factor
+RETRAIN_GROWTH = 2
+
 
 class VectorStoreRetriever:
     """
     A utility class for creating and retrieving a FAISS-based vector store
-    from Markdown documents.
+    from the Markdown and text documents in a directory.
+
+    A manifest next to the index records the content hash of every file and
+    the IDs of its chunks. On start-up only new or changed files are split and
+    embedded again, unchanged chunks keep their vectors, and the chunks of
+    removed files are deleted from the index.
     """
 
     def __init__(
@@ -27,67 +59,333 @@ class VectorStoreRetriever:
         index_dir: str = settings.FAISS_INDEX,
         chunk_size: int = 256,
         chunk_overlap: int = 50,
+        index_type: str = settings.FAISS_INDEX_TYPE,
+        index_format: str = settings.INDEX_FORMAT,
     ):
         self.path_docs = Path(path_docs)
-        self.embeddings = FastEmbedEmbeddings()
+        self.embeddings = FastEmbedEmbeddings(batch_size=settings.EMBED_BATCH_SIZE, threads=settings.EMBED_THREADS)
         self.index_dir = Path(index_dir)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.index_type = index_type
+        self.index_format = index_format
+        self.splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
-        if self._index_exists():
+        # changes whenever the indexed content changes, so cached search results are dropped
+        self.generation = next(INDEX_GENERATIONS)
+        self._bm25 = BM25Index()
+        self._bm25_generation = None
+        self._bm25_lock = threading.Lock()
+
+        self.vector_store = None
+        self.manifest = self._load_manifest()
+        if self._index_exists() and self.manifest is not None:
             logger.info(f"FAISS index found in {self.index_dir}, loading instead of rebuilding.")
             self.vector_store = self._load_vector_store()
+            # a corpus too small to train on is stored flat, but was still built for the configured type
+            built_for = self.manifest.get("index_type") or index_type_of(self.vector_store.index)
+            if built_for != self.index_type:
+                logger.info(f"Saved index is {built_for}, rebuilding as {self.index_type}.")
+                self.vector_store = None
+            elif isinstance(self.vector_store.docstore, SQLiteDocstore) and not self.vector_store.docstore.has_postings():
+                logger.info("Saved docstore has no BM25 postings, rebuilding the FAISS index.")
+                self.vector_store = None
+
+        if self.vector_store is None:
+            self.rebuild()
         else:
-            logger.info("No FAISS index found, building a new one.")
-            self.documents = self._load_docs()
-            self.vector_store = self._build_vector_store()
+            self.sync()
 
     def _index_exists(self) -> bool:
-        """Check if FAISS index and pkl files exist."""
+        """Check if the FAISS index and its docstore (pkl or SQLite) exist."""
         faiss_file = self.index_dir / "index.faiss"
-        pkl_file = self.index_dir / "index.pkl"
-        return faiss_file.exists() and pkl_file.exists()
+        docstore_file = self.index_dir / ("docstore.db" if self.index_format == "mmap" else "index.pkl")
+        return faiss_file.exists() and docstore_file.exists()
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        """Read the manifest, or None if it is missing or was built with other chunking settings."""
+        path = self.index_dir / MANIFEST_FILE
+        if not path.exists():
+            return None
+        manifest = json.loads(path.read_text())
+        if (manifest.get("chunk_size"), manifest.get("chunk_overlap")) != (self.chunk_size, self.chunk_overlap):
+            logger.info("Chunking settings changed, rebuilding the FAISS index.")
+            return None
+        if manifest.get("format", "pickle") != self.index_format:
+            logger.info(f"Index format changed to {self.index_format}, rebuilding the FAISS index.")
+            return None
+        return manifest
+
+    def _save(self) -> None:
+        """Persist the index and its manifest."""
+        self.generation = next(INDEX_GENERATIONS)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        if self.index_format == "mmap":
+            # replace both files atomically: other processes keep the index and docstore they opened
+            docstore = self.vector_store.docstore
+            docstore.save_index_map(self.vector_store.index_to_docstore_id)
+            docstore.close()
+            tmp_file = self.index_dir / "index.faiss.tmp"
+            faiss.write_index(self.vector_store.index, str(tmp_file))
+            os.replace(docstore.db_path, self.index_dir / "docstore.db")
+            os.replace(tmp_file, self.index_dir / "index.faiss")
+            self.vector_store.docstore = SQLiteDocstore(str(self.index_dir / "docstore.db"))
+        else:
+            self.vector_store.save_local(str(self.index_dir))
+        self.manifest["format"] = self.index_format
+        (self.index_dir / MANIFEST_FILE).write_text(json.dumps(self.manifest, indent=2))
+
+    def _scan_docs(self) -> Dict[str, str]:
+        """Return the content hash of every supported file under `path_docs`, by relative path."""
+        files = {}
+        for path in sorted(self.path_docs.rglob("*")):
+            if path.is_file() and path.suffix.lower() in LOADERS:
+                files[path.relative_to(self.path_docs).as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+        return files
+
+    def _load_file(self, rel_path: str) -> Dict[str, Document]:
+        """Load and split one document, keyed by chunk ID."""
+        path = self.path_docs / rel_path
+        docs = LOADERS[path.suffix.lower()](str(path)).load()
+
+        chunks: Dict[str, Document] = {}
+        for chunk in self.splitter.split_documents(docs):
+            # the ID depends only on the file and the chunk text, so unchanged chunks keep theirs
+            digest = hashlib.sha256(f"{rel_path}\0{chunk.page_content}".encode()).hexdigest()
+            chunk_id, n = digest, 1
+            while chunk_id in chunks:
+                chunk_id, n = f"{digest}-{n}", n + 1
+            chunks[chunk_id] = chunk
+        return chunks
+
+    def _iter_chunks(self, rel_paths: Iterable[str], chunk_ids: Dict[str, List[str]]) -> Iterator[Tuple[str, Document]]:
+        """Load and split files one at a time, recording the chunk IDs of each file."""
+        for rel_path in rel_paths:
+            file_chunks = self._load_file(rel_path)
+            chunk_ids[rel_path] = list(file_chunks)
+            yield from file_chunks.items()
 
-    def _load_docs(self):
-        """Load and split Markdown documents."""
-        logger.info(f"Loading documents from {self.path_docs}")
-        loader = UnstructuredMarkdownLoader(str(self.path_docs / "faq.md"))
-        docs = loader.load()
+    def _embed_batches(self, chunks: Iterable[Tuple[str, Document]]) -> Iterator[Batch]:
+        return embed_batches(self.embeddings, chunks, batch_size=settings.EMBED_BATCH_SIZE, workers=settings.EMBED_WORKERS)
 
-        splitter = RecursiveCharacterTextSplitter(chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
-        return splitter.split_documents(docs)
+    def _add(self, ids: List[str], docs: List[Document], vectors: np.ndarray) -> None:
+        self.vector_store.add_embeddings(
+            zip([doc.page_content for doc in docs], vectors.tolist()),
+            metadatas=[doc.metadata for doc in docs],
+            ids=ids,
+        )
+
+    def rebuild(self) -> None:
+        """
+        Embed every document into a new index and save it.
 
-    def _build_vector_store(self):
-        """Create a FAISS vector store from documents and save locally."""
-        dim = len(self.embeddings.embed_query("hello world"))
-        index = faiss.IndexFlatL2(dim)
+        Files are loaded, split and embedded as a stream and every batch is
+        appended to the index as soon as it is embedded. Trained (IVF) indexes
+        are trained on the first FAISS_TRAIN_SIZE chunks before the rest is
+        streamed in.
+        """
+        logger.info(f"Building {self.index_type} vector store from {self.path_docs}")
+        files = self._scan_docs()
+        chunk_ids: Dict[str, List[str]] = {}
+        batches = self._embed_batches(self._iter_chunks(files, chunk_ids))
 
-        vector_store = FAISS(
+        buffered: List[Batch] = []
+        if self.index_type in TRAINED_INDEX_TYPES:
+            for batch in batches:
+                buffered.append(batch)
+                if sum(len(ids) for ids, _, _ in buffered) >= settings.FAISS_TRAIN_SIZE:
+                    break
+        if buffered:
+            sample = np.vstack([vectors for _, _, vectors in buffered])
+        else:
+            sample = np.empty((0, embedding_dimension(self.embeddings)), dtype=np.float32)
+
+        index = build_index(
+            sample,
+            index_type=self.index_type,
+            nlist=settings.FAISS_NLIST or None,
+            pq_m=settings.FAISS_PQ_M,
+            pq_nbits=settings.FAISS_PQ_NBITS,
+            hnsw_m=settings.FAISS_HNSW_M,
+            ef_construction=settings.FAISS_EF_CONSTRUCTION,
+        )
+        self.vector_store = FAISS(
             embedding_function=self.embeddings,
             index=index,
-            docstore=InMemoryDocstore(),
+            docstore=self._new_docstore(),
             index_to_docstore_id={},
         )
-        logger.info(f"Building vector store from {len(self.documents)} documents")
-        vector_store.add_documents(self.documents)
+        while buffered:
+            self._add(*buffered.pop(0))
+        for batch in batches:
+            self._add(*batch)
+        set_search_params(self.vector_store.index, nprobe=settings.FAISS_NPROBE, ef_search=settings.FAISS_EF_SEARCH)
+        logger.info(f"Indexed {self.vector_store.index.ntotal} chunks from {len(files)} files")
 
-        # pastikan folder ada
-        self.index_dir.mkdir(parents=True, exist_ok=True)
-        vector_store.save_local(str(self.index_dir))
-        return vector_store
+        self.manifest = {
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "index_type": self.index_type,
+            "effective_index_type": index_type_of(self.vector_store.index),
+            "trained_on": self.vector_store.index.ntotal,
+            "files": {rel_path: {"hash": files[rel_path], "chunks": chunk_ids[rel_path]} for rel_path in files},
+        }
+        self._save()
+
+    def sync(self) -> None:
+        """
+        Bring the saved index up to date with `path_docs`.
+
+        Only new and changed files are split; of their chunks, only those not
+        already indexed are embedded. Chunks that no longer exist are removed
+        from flat indexes; HNSW indexes do not support removal, and IVF
+        indexes keep the original IDs of the surviving vectors while the
+        langchain store renumbers its positions, so removals from those fall
+        back to `rebuild`, as does a trained index the corpus has outgrown.
+        """
+        set_search_params(self.vector_store.index, nprobe=settings.FAISS_NPROBE, ef_search=settings.FAISS_EF_SEARCH)
+
+        files = self._scan_docs()
+        indexed = self.manifest["files"]
+        changed = [rel_path for rel_path, digest in files.items() if indexed.get(rel_path, {}).get("hash") != digest]
+        removed = [rel_path for rel_path in indexed if rel_path not in files]
+        if not changed and not removed:
+            logger.info("FAISS index is up to date.")
+            return
+
+        old_ids = {chunk_id for rel_path in changed + removed for chunk_id in indexed.get(rel_path, {}).get("chunks", [])}
+        chunks_by_file = {rel_path: self._load_file(rel_path) for rel_path in changed}
+        new_chunks = {chunk_id: doc for file_chunks in chunks_by_file.values() for chunk_id, doc in file_chunks.items() if chunk_id not in old_ids}
+        stale_ids = old_ids - {chunk_id for file_chunks in chunks_by_file.values() for chunk_id in file_chunks}
+
+        total = self.vector_store.index.ntotal - len(stale_ids) + len(new_chunks)
+        cannot_delete = bool(stale_ids) and (self.index_type == "hnsw" or self.index_type in TRAINED_INDEX_TYPES)
+        outgrown = self.index_type in TRAINED_INDEX_TYPES and total > RETRAIN_GROWTH * max(self.manifest.get("trained_on", 0), 1)
+        if cannot_delete or outgrown:
+            logger.info("Index cannot be updated in place, rebuilding.")
+            self.rebuild()
+            return
+
+        if self.index_format == "mmap":
+            # a memory-mapped index is read-only and the docstore is shared, modify private copies
+            self.vector_store.index = faiss.read_index(str(self.index_dir / "index.faiss"))
+            set_search_params(self.vector_store.index, nprobe=settings.FAISS_NPROBE, ef_search=settings.FAISS_EF_SEARCH)
+            self.vector_store.docstore = self.vector_store.docstore.copy(str(self.index_dir / "docstore.db.tmp"))
+
+        logger.info(f"Updating FAISS index: {len(changed)} changed and {len(removed)} removed file(s), {len(new_chunks)} chunk(s) to embed, {len(stale_ids)} to delete")
+        if stale_ids:
+            self.vector_store.delete(list(stale_ids))
+        for batch in self._embed_batches(new_chunks.items()):
+            self._add(*batch)
+
+        for rel_path in removed:
+            del indexed[rel_path]
+        for rel_path, file_chunks in chunks_by_file.items():
+            indexed[rel_path] = {"hash": files[rel_path], "chunks": list(file_chunks)}
+        self._save()
+
+    def _new_docstore(self):
+        """Return an empty docstore for a rebuild; in mmap format a new file that `_save` swaps in."""
+        if self.index_format == "mmap":
+            tmp_file = self.index_dir / "docstore.db.tmp"
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file.unlink(missing_ok=True)
+            return SQLiteDocstore(str(tmp_file))
+        return InMemoryDocstore()
 
     def _load_vector_store(self):
         """Load existing FAISS index."""
+        if self.index_format == "mmap":
+            # vectors are paged in from the file on demand and shared between processes through
+            # the page cache: IO_FLAG_MMAP maps IVF inverted lists but copies flat codes (flat,
+            # HNSW storage) into memory, those are mapped in place with IO_FLAG_MMAP_IFC
+            stored_type = self.manifest.get("effective_index_type", self.index_type)
+            mmap_flag = faiss.IO_FLAG_MMAP if stored_type in TRAINED_INDEX_TYPES else faiss.IO_FLAG_MMAP_IFC
+            index = faiss.read_index(str(self.index_dir / "index.faiss"), mmap_flag)
+            docstore = SQLiteDocstore(str(self.index_dir / "docstore.db"))
+            return FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=docstore.load_index_map(),
+            )
         return FAISS.load_local(str(self.index_dir), self.embeddings, allow_dangerous_deserialization=True)
 
-    def load_retriever(self):
-        """Return retriever wrapper around vector store."""
-        logger.info(f"Loading retriever from {self.index_dir}")
-        return self.vector_store.as_retriever(search_kwargs={"k": 5})
+    def _sparse_search(self, query: str, n: int) -> List[str]:
+        """
+        Return the IDs of the `n` best BM25 matches.
+
+        The mmap format scores from the postings stored in docstore.db; the
+        pickle format keeps every chunk in memory anyway and builds an
+        in-memory BM25 index from them.
+        """
+        if isinstance(self.vector_store.docstore, SQLiteDocstore):
+            return [doc_id for doc_id, _ in self.vector_store.docstore.bm25_search(query, n)]
+        return [doc_id for doc_id, _ in self._sparse_index().search(query, n)]
+
+    def _sparse_index(self) -> BM25Index:
+        """Return the in-memory BM25 index of the current chunks, rebuilt after the FAISS index changed."""
+        with self._bm25_lock:
+            if self._bm25_generation != self.generation:
+                bm25 = BM25Index()
+                for doc_id in self.vector_store.index_to_docstore_id.values():
+                    bm25.add(doc_id, self.vector_store.docstore.search(doc_id).page_content)
+                self._bm25, self._bm25_generation = bm25, self.generation
+            return self._bm25
+
+    def _dense_search(self, vector: List[float], n: int) -> List[str]:
+        """Return the IDs of the `n` nearest chunks."""
+        _, indices = self.vector_store.index.search(np.asarray([vector], dtype=np.float32), n)
+        return [self.vector_store.index_to_docstore_id[i] for i in indices[0] if i != -1]
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed the normalised query, reusing cached embeddings."""
+        key = normalize_query(query)
+        vector = QUERY_CACHE.embeddings.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(key)
+            QUERY_CACHE.embeddings.put(key, vector)
+        return vector
+
+    def search(self, query: str, k: int = settings.KB_TOP_K) -> List[Document]:
+        """
+        Return the `k` chunks most relevant to `query`.
+
+        With KB_HYBRID, the FAISS neighbours and the BM25 matches (exact terms
+        such as drug names or service codes) are fused with reciprocal-rank
+        fusion. With KB_RERANK_MODEL, the fused candidates are then reordered
+        by a cross-encoder before the top `k` are returned.
+
+        Both the query embedding and the result are cached by the normalised
+        query text, so repeated questions skip the embedding model and FAISS.
+        """
+        key = normalize_query(query)
+        generation = self.generation
+        docs = QUERY_CACHE.get_results(key, k, generation)
+        if docs is not None:
+            return docs
+
+        vector = self.embed_query(key)
+        n_candidates = max(k, settings.KB_CANDIDATES)
+        ids = self._dense_search(vector, n_candidates)
+        if settings.KB_HYBRID:
+            sparse = self._sparse_search(key, n_candidates)
+            ids = [doc_id for doc_id, _ in reciprocal_rank_fusion([ids, sparse])][:n_candidates]
+
+        # the docstore returns a "not found" string for IDs it does not have
+        docs = [doc for doc in map(self.vector_store.docstore.search, ids) if isinstance(doc, Document)]
+        if settings.KB_RERANK_MODEL and len(docs) > 1:
+            order = RERANKER_PROVIDER.get().rerank(query, [doc.page_content for doc in docs])
+            docs = [docs[i] for i in order]
+
+        docs = docs[:k]
+        QUERY_CACHE.put_results(key, k, generation, docs)
+        return docs
 
 
-VECTORESTORE: VectorStoreRetriever = VectorStoreRetriever()
-retriever = VECTORESTORE.load_retriever()
+# the embedding model and FAISS index are loaded on first use, not at import time
+VECTOR_STORE_PROVIDER: Lazy[VectorStoreRetriever] = Lazy("vector_store", VectorStoreRetriever)
+RERANKER_PROVIDER: Lazy[CrossEncoderReranker] = Lazy("reranker", lambda: CrossEncoderReranker(settings.KB_RERANK_MODEL))
 
 
 @tool("knowledge_base_tool", args_schema=InputKnowledgeBase)
@@ -97,7 +395,7 @@ def knowledge_base_tool(query: str):
     from stored documents and return the most relevant excerpts.
     """
     logger.info(f"Searching query: {query}")
-    docs = retriever.invoke(query)
+    docs = VECTOR_STORE_PROVIDER.get().search(query)
     return "\n\n".join([doc.page_content for doc in docs])
 
 
@@ -1,28 +1,31 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import Any, Callable, Dict, List, Optional
 
 import pytz
 from googleapiclient.errors import HttpError
-from langchain_core.tools import tool
 from loguru import logger
 
-from src.agent.core import CALENDAR_SERVICE, EMAIL_SERVICE
+from src.agent.core import EVENT_CACHE, execute_request, get_calendar_service, get_email_service
 from src.agent.hitl import human_in_the_loop
 from src.agent.model import CancelAppointment, SendAppointment, UpdateAppointment
 from src.agent.setting import settings
 from src.agent.utils import format_event, format_event_details
 
-from .helper import create_event, is_within_doctor_schedule
+from .helper import calendar_tool, create_event, is_within_doctor_schedule, list_all_events, list_events, patch_event
 from .schema import (
     InputCancelAppointment,
     InputCreateAppointment,
+    InputGetAvailableSlots,
     InputGetDoctorSchedule,
     InputGetEventById,
     InputUpdateAppointment,
 )
+from .slots import busy_intervals, compute_free_slots
 
+MAX_SLOT_SEARCH_DAYS = 14
 
-@tool("get_doctor_schedule_appointments", args_schema=InputGetDoctorSchedule)
+
+@calendar_tool("get_doctor_schedule_appointments", args_schema=InputGetDoctorSchedule)
 def get_doctor_schedule_appointments(
     start_datetime: datetime,
     end_datetime: datetime,
@@ -34,24 +37,13 @@ def get_doctor_schedule_appointments(
     """
     try:
         logger.info("Using tools get_doctor_schedule_appointments")
-        # Format time to ISO format
-        time_min_iso = start_datetime.isoformat() + "Z"
-        time_max_iso = end_datetime.isoformat() + "Z"
-
-        event_results = (
-            CALENDAR_SERVICE.events()
-            .list(
-                calendarId=settings.CALENDAR_ID,
-                timeMin=time_min_iso,
-                timeMax=time_max_iso,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy="startTime",
-            )
-            .execute()
-        )
+        # naive datetimes are interpreted as UTC
+        if start_datetime.tzinfo is None:
+            start_datetime = start_datetime.replace(tzinfo=pytz.utc)
+        if end_datetime.tzinfo is None:
+            end_datetime = end_datetime.replace(tzinfo=pytz.utc)
 
-        events = event_results.get("items", [])
+        events = list_events(start_datetime, end_datetime, max_results)
         formatted_events = [format_event(event) for event in events]
 
         logger.success("Succesfully get events...")
@@ -72,7 +64,60 @@ def get_doctor_schedule_appointments(
         }
 
 
-@tool("get_event_by_id", args_schema=InputGetEventById)
+@calendar_tool("get_available_slots", args_schema=InputGetAvailableSlots)
+def get_available_slots(
+    start_date: date,
+    end_date: date,
+    duration_minutes: int = 30,
+) -> Dict[str, Any]:
+    """
+    Use this tool to find the doctor's free appointment slots between two dates.
+    Returns ready-to-book start times per day, already excluding booked appointments
+    and times outside the doctor's practice hours.
+    """
+    try:
+        logger.info("Using tools get_available_slots")
+        if end_date < start_date:
+            return {"success": False, "days": [], "message": "end_date must not be before start_date"}
+        if (end_date - start_date).days > MAX_SLOT_SEARCH_DAYS:
+            end_date = start_date + timedelta(days=MAX_SLOT_SEARCH_DAYS)
+
+        tz = pytz.timezone("Asia/Jakarta")
+        time_min = tz.localize(datetime.combine(start_date, time.min))
+        time_max = tz.localize(datetime.combine(end_date + timedelta(days=1), time.min))
+
+        # every page and no cache: a booking missing here would be offered as a free slot
+        events = list_all_events(time_min, time_max)
+        slots = compute_free_slots(
+            start_date,
+            end_date,
+            busy_intervals(events),
+            duration_minutes=duration_minutes,
+            not_before=datetime.now(tz=tz),
+        )
+
+        days: Dict[date, Dict[str, Any]] = {}
+        for slot_start, _ in slots:
+            day = days.setdefault(
+                slot_start.date(),
+                {"date": slot_start.strftime("%d %B %Y"), "day": slot_start.strftime("%A"), "slots": []},
+            )
+            day["slots"].append(slot_start.strftime("%H:%M"))
+
+        logger.success("Succesfully get available slots...")
+        return {
+            "success": True,
+            "duration_minutes": duration_minutes,
+            "days": list(days.values()),
+            "message": f"Found {len(slots)} free slot(s) until {end_date.strftime('%d %B %Y')}",
+        }
+
+    except (HttpError, ValueError) as error:
+        logger.error(f"Error in get_available_slots: {error}")
+        return {"success": False, "days": [], "message": f"Error get available slots: {error}"}
+
+
+@calendar_tool("get_event_by_id", args_schema=InputGetEventById)
 def get_event_by_id(event_id: str) -> Dict[str, Any]:
     """
     Use this tool when the user requests to search for an event by ID.
@@ -81,7 +126,7 @@ def get_event_by_id(event_id: str) -> Dict[str, Any]:
     try:
         logger.info("Using tool get_event_by_id")
 
-        event = CALENDAR_SERVICE.events().get(calendarId=settings.CALENDAR_ID, eventId=event_id).execute()
+        event = execute_request(get_calendar_service().events().get(calendarId=settings.CALENDAR_ID, eventId=event_id))
 
         formatted_event = format_event_details(event)
         logger.success("Succesfully get_event_by_id...")
@@ -97,7 +142,7 @@ def get_event_by_id(event_id: str) -> Dict[str, Any]:
         return {"success": False, "event": None, "message": f"Error get event: {error}"}
 
 
-@tool("create_doctor_appointment", args_schema=InputCreateAppointment)
+@calendar_tool("create_doctor_appointment", args_schema=InputCreateAppointment)
 def create_doctor_appointment(
     patient_name: str,
     patient_email: str,
@@ -162,12 +207,13 @@ def create_doctor_appointment(
                 duration=duration_minutes,
                 location="Klinik Sehat Bersama, Jl. Merdeka No. 123, Jakarta Pusat",
             )
-            EMAIL_SERVICE.send_appointment_created(appointment_data)
+            notification_id = get_email_service().queue_appointment_created(appointment_data)
 
             return {
                 "success": True,
                 "event_id": result["event_id"],
-                "message": f"✅ Appointment created and confirmation email sent to {patient_email}!",
+                "notification_id": notification_id,
+                "message": f"✅ Appointment created, confirmation email will be sent to {patient_email}!",
             }
 
     except Exception as error:
@@ -179,7 +225,7 @@ def create_doctor_appointment(
         }
 
 
-@tool("update_doctor_appointment", args_schema=InputUpdateAppointment)
+@calendar_tool("update_doctor_appointment", args_schema=InputUpdateAppointment)
 def update_doctor_appointment(
     event_id: str,
     patient_name: str,
@@ -194,11 +240,21 @@ def update_doctor_appointment(
     Use this tool to Update specific fields of an existing Google Calendar event;
     others remain unchanged.
     """
+    etag = None
     if start_datetime is not None:
-        duration_minutes = 30
-
-        if end_datetime is not None:
-            duration_minutes = int((end_datetime - start_datetime).total_seconds() / 60)
+        if end_datetime is None:
+            # moved without a new end time: keep the appointment's current duration
+            try:
+                event = execute_request(get_calendar_service().events().get(calendarId=settings.CALENDAR_ID, eventId=event_id))
+            except HttpError as error:
+                logger.error(f"Error update_doctor_appointment: {error}")
+                return {"success": False, "message": f"Error update appointment: {error}"}
+            current = format_event_details(event)
+            duration = current["end_time"] - current["start_time"] if current["start_time"] else timedelta(minutes=30)
+            end_datetime = start_datetime + duration
+            # the duration is only valid while the event is unchanged
+            etag = event.get("etag")
+        duration_minutes = int((end_datetime - start_datetime).total_seconds() / 60)
 
         try:
             is_within_doctor_schedule(start_datetime, duration_minutes)
@@ -221,46 +277,47 @@ def update_doctor_appointment(
         timezone = "Asia/Jakarta"
         tz = pytz.timezone(timezone)
 
-        existing_event = CALENDAR_SERVICE.events().get(calendarId=settings.CALENDAR_ID, eventId=event_id).execute()
-
-        # Update field yang diberikan
+        # Only send the fields that change
+        changes: Dict[str, Any] = {}
         if title is not None:
-            existing_event["summary"] = title
+            changes["summary"] = title
         if description is not None:
-            existing_event["description"] = description
+            changes["description"] = description
         if location is not None:
-            existing_event["location"] = location
+            changes["location"] = location
         if start_datetime is not None:
             start_datetime = tz.localize(start_datetime)
-            existing_event["start"] = {
+            changes["start"] = {
                 "dateTime": start_datetime.isoformat(),
                 "timeZone": timezone,
             }
         if end_datetime is not None:
             end_datetime = tz.localize(end_datetime)
-            existing_event["end"] = {
+            changes["end"] = {
                 "dateTime": end_datetime.isoformat(),
                 "timeZone": timezone,
             }
 
-        # Update event
-        updated_event = CALENDAR_SERVICE.events().update(calendarId=settings.CALENDAR_ID, eventId=event_id, body=existing_event).execute()
+        # patch returns the full updated event, so the email needs no extra fetch
+        updated_event = patch_event(event_id, changes, etag=etag)
 
         formatted_event = format_event_details(updated_event)
         logger.success("Success update appointment...")
+        notification_id = None
         if formatted_event:
             update_appointment = UpdateAppointment(
                 patient_name=patient_name,
                 patient_email=patient_email,
                 title=formatted_event["title"],
-                new_datetime=formatted_event["start_time"],
+                new_datetime=formatted_event["start_time"].strftime("%d %B %Y, %H:%M WIB") if formatted_event["start_time"] else "",
                 description=formatted_event["description"],
                 location=formatted_event["location"],
             )
-            EMAIL_SERVICE.send_appointment_updated(update_appointment)
+            notification_id = get_email_service().queue_appointment_updated(update_appointment)
 
         return {
             "success": True,
+            "notification_id": notification_id,
             "message": f'appointment "{event_id}" successfully update',
         }
 
@@ -269,7 +326,7 @@ def update_doctor_appointment(
         return {"success": False, "message": f"Error update appointment: {error}"}
 
 
-@tool("cancel_doctor_appointment", args_schema=InputCancelAppointment)
+@calendar_tool("cancel_doctor_appointment", args_schema=InputCancelAppointment)
 def cancel_doctor_appointment(
     event_id: str,
     reason: str,
@@ -283,7 +340,8 @@ def cancel_doctor_appointment(
     """
     try:
         logger.info("Using tools cancel_doctor_appointment...")
-        _ = CALENDAR_SERVICE.events().delete(calendarId=settings.CALENDAR_ID, eventId=event_id).execute()
+        _ = execute_request(get_calendar_service().events().delete(calendarId=settings.CALENDAR_ID, eventId=event_id))
+        EVENT_CACHE.invalidate(event_id=event_id)
 
         logger.success("Success delete appointment...")
         cancel_appointment = CancelAppointment(
@@ -294,8 +352,12 @@ def cancel_doctor_appointment(
             appointment_type=appointment_type,
             reason=reason,
         )
-        EMAIL_SERVICE.send_appointment_cancelled(cancel_appointment)
-        return {"success": True, "message": f'Appointment "{event_id}" success deleted'}
+        notification_id = get_email_service().queue_appointment_cancelled(cancel_appointment)
+        return {
+            "success": True,
+            "notification_id": notification_id,
+            "message": f'Appointment "{event_id}" success deleted',
+        }
 
     except HttpError as error:
         logger.error(f"Error cancel_doctor_appointment: {error}")
@@ -309,6 +371,7 @@ HITL_CANCEL_APPOINTMENT = human_in_the_loop(cancel_doctor_appointment)
 
 TOOLS_CALENDAR: List[Callable[..., Any]] = [
     get_doctor_schedule_appointments,
+    get_available_slots,
     get_event_by_id,
     # sensitif tools
     HITL_CREATE_APPOINTMENT,
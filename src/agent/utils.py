@@ -1,16 +1,29 @@
 """Utility & helper functions."""
 
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Tuple
 
 import pytz
 from langchain.chat_models import init_chat_model
-from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
 from langchain_core.messages import BaseMessage, ToolMessage
-from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables import Runnable, RunnableLambda
 from langgraph.prebuilt import ToolNode
 from loguru import logger
 
+from src.agent.core import Lazy
+from src.agent.setting import settings
+
+# file sink is added on first use instead of at import time
+LOG_SINK_PROVIDER = Lazy("logging", lambda: logger.add("logger.log", rotation="10 MB", retention="10 days", level="DEBUG"))
+
+
+def configure_logging() -> None:
+    """Add the rotating file log sink once."""
+    LOG_SINK_PROVIDER.get()
+
 
 def format_event_details(event: Dict) -> Dict:
     """Format raw Google Calendar event data into structured details."""
@@ -94,15 +107,6 @@ def create_tool_node_with_fallback(tools: List[Any]) -> ToolNode:
     return ToolNode(tools).with_fallbacks([RunnableLambda(handle_tool_error)], exception_key="error")
 
 
-def task_done_callback(task):
-    try:
-        result = task.result()
-        if result and "error" not in result:
-            logger.debug("Memory save completed successfully")
-    except Exception as e:
-        logger.error(f"Memory save task failed: {e}")
-
-
 def get_message_text(msg: BaseMessage) -> str:
     """Extract plain text from a message."""
     content = msg.content
@@ -118,3 +122,38 @@ def load_chat_model(fully_specified_name: str) -> BaseChatModel:
     """Load a chat model from a fully specified name (provider/model)."""
     provider, model = fully_specified_name.split("/", maxsplit=1)
     return init_chat_model(model, model_provider=provider)
+
+
+# bound models keyed by (model name, tool names), least recently used first
+_BOUND_MODELS: "OrderedDict[Tuple[str, Tuple[str, ...]], Runnable[LanguageModelInput, BaseMessage]]" = OrderedDict()
+_BOUND_MODELS_LOCK = threading.Lock()
+
+
+def get_bound_model(fully_specified_name: str, tools: Sequence[Any]) -> Runnable[LanguageModelInput, BaseMessage]:
+    """
+    Return a chat model with `tools` bound, reusing a cached instance.
+
+    Creating the model builds a new provider client and serialises every tool
+    schema, so the result is kept in a bounded LRU cache shared by all graph
+    steps and threads. The model and its HTTP connection pool are reused.
+
+    Args:
+        fully_specified_name: Model name in the form provider/model.
+        tools: Tools to bind; cached by their names.
+
+    Returns:
+        The model with the tools bound.
+    """
+    key = (fully_specified_name, tuple(getattr(tool, "name", repr(tool)) for tool in tools))
+    with _BOUND_MODELS_LOCK:
+        model = _BOUND_MODELS.get(key)
+        if model is not None:
+            _BOUND_MODELS.move_to_end(key)
+            return model
+
+        model = load_chat_model(fully_specified_name).bind_tools(tools)
+        _BOUND_MODELS[key] = model
+        if len(_BOUND_MODELS) > settings.BOUND_MODEL_CACHE_SIZE:
+            _BOUND_MODELS.popitem(last=False)
+        logger.debug(f"Bound {len(tools)} tool(s) to {fully_specified_name}")
+        return model
@@ -0,0 +1,8 @@
+import os
+
+# backends are replaced in the tests, the credentials only have to pass validation
+for name in ["GOOGLE_API_KEY", "MEM0_API_KEY", "ACCOUNT_GMAIL", "PASSWORD_GMAIL", "CALENDAR_ID", "LANGSMITH_PROJECT", "LANGSMITH_API_KEY"]:
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("SERVICE_ACCOUNT_FILE", "test.json")
+os.environ.setdefault("LANGSMITH_TRACING_V2", "false")
+os.environ.setdefault("WARM_UP_ON_START", "false")
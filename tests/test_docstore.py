@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from src.agent.tools.docstore import SQLiteDocstore
+from src.agent.tools.hybrid import BM25Index
+
+TEXTS = {
+    "a": "Paracetamol 500 mg for fever, three times a day",
+    "b": "BPJS patients register at the front desk",
+    "c": "The clinic opens at 08:00 and closes at 20:00",
+    "d": "Fever in children: paracetamol syrup, see the doctor if fever lasts",
+}
+
+
+def test_bm25_search_matches_the_in_memory_index(tmp_path: Path):
+    docstore = SQLiteDocstore(str(tmp_path / "docstore.db"))
+    docstore.add({doc_id: Document(page_content=text) for doc_id, text in TEXTS.items()})
+    bm25 = BM25Index()
+    for doc_id, text in TEXTS.items():
+        bm25.add(doc_id, text)
+
+    for query in ["paracetamol fever", "BPJS", "clinic opens", "unknown words"]:
+        assert [doc_id for doc_id, _ in docstore.bm25_search(query)] == [doc_id for doc_id, _ in bm25.search(query)]
+
+
+def test_deleted_chunks_leave_the_postings(tmp_path: Path):
+    docstore = SQLiteDocstore(str(tmp_path / "docstore.db"))
+    docstore.add({doc_id: Document(page_content=text) for doc_id, text in TEXTS.items()})
+    docstore.delete(["a"])
+    docstore.add({"d": Document(page_content="Vaccination schedule for children")})
+
+    assert [doc_id for doc_id, _ in docstore.bm25_search("paracetamol fever")] == []
+    assert [doc_id for doc_id, _ in docstore.bm25_search("children")] == ["d"]
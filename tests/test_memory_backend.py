@@ -0,0 +1,27 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.agent.memory import LocalMemoryBackend
+
+
+def test_local_search_runs_off_the_event_loop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    backend = LocalMemoryBackend(str(tmp_path / "memory.db"), embeddings=DeterministicFakeEmbedding(size=16))
+    backend.add_sync(["I use BPJS insurance"], user_id="budi")
+    backend._users.clear()
+
+    threads: List[threading.Thread] = []
+    search_sync = backend.search_sync
+    monkeypatch.setattr(backend, "search_sync", lambda *args: threads.append(threading.current_thread()) or search_sync(*args))
+
+    async def search() -> List[str]:
+        loop_thread = threading.current_thread()
+        memories = await backend.search("insurance", user_id="budi")
+        assert threads and threads[0] is not loop_thread
+        return memories
+
+    assert asyncio.run(search()) == ["I use BPJS insurance"]
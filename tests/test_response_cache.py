@@ -0,0 +1,44 @@
+import asyncio
+import importlib
+import time
+from typing import List, Optional
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agent.response_cache import CachedResponse
+from src.agent.setting import settings
+from src.agent.state import State
+
+# the module, not the compiled `graph` that `src.agent` re-exports under the same name
+graph = importlib.import_module("src.agent.graph")
+
+
+@pytest.fixture
+def lookups(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Questions looked up in a cache that has an answer for everything."""
+    questions: List[str] = []
+
+    def lookup_response(question: str) -> Optional[CachedResponse]:
+        questions.append(question)
+        return CachedResponse(question="Jam buka klinik?", answer="Klinik buka 08:00-20:00", vector=np.zeros(1), generation=1, created_at=time.time())
+
+    monkeypatch.setattr(graph, "lookup_response", lookup_response)
+    monkeypatch.setattr(settings, "STREAM_RESPONSES", False)
+    return questions
+
+
+def test_first_question_is_answered_from_the_cache(lookups: List[str]):
+    update = asyncio.run(graph.check_response_cache(State(messages=[HumanMessage("jam buka klinik")])))
+
+    assert lookups == ["jam buka klinik"]
+    assert update["messages"][0].content == "Klinik buka 08:00-20:00"
+
+
+def test_follow_up_question_misses_the_cache(lookups: List[str]):
+    messages = [HumanMessage("Berapa biaya konsultasi?"), AIMessage("Rp150.000"), HumanMessage("jam buka klinik")]
+    update = asyncio.run(graph.check_response_cache(State(messages=messages)))
+
+    assert lookups == []
+    assert update == {}
@@ -0,0 +1,54 @@
+import time
+import uuid
+from typing import Any, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from src.agent.tool_node import ParallelToolNode
+
+
+@tool
+def slow_lookup(query: str) -> str:
+    """Look something up, slowly."""
+    time.sleep(1.0)
+    return query
+
+
+@tool
+def fast_lookup(query: str) -> str:
+    """Look something up."""
+    return query
+
+
+def tool_calls(name: str, n: int) -> dict:
+    return {"messages": [AIMessage(content="", tool_calls=[{"name": name, "args": {"query": str(i)}, "id": f"call_{i}"} for i in range(n)])]}
+
+
+def test_timeouts_share_one_deadline():
+    node = ParallelToolNode([slow_lookup], max_concurrency=3, timeout=0.3)
+
+    started = time.perf_counter()
+    result = node.invoke(tool_calls("slow_lookup", 3))
+
+    assert time.perf_counter() - started < 0.6
+    assert [message.status for message in result["messages"]] == ["error"] * 3
+
+
+class ToolRuns(BaseCallbackHandler):
+    def __init__(self):
+        self.run_ids: List[uuid.UUID] = []
+
+    def on_tool_start(self, serialized: Any, input_str: str, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        self.run_ids.append(run_id)
+
+
+def test_each_call_gets_its_own_run():
+    runs = ToolRuns()
+    node = ParallelToolNode([fast_lookup], max_concurrency=3)
+
+    result = node.invoke(tool_calls("fast_lookup", 3), {"callbacks": [runs], "run_id": uuid.uuid4(), "configurable": {}})
+
+    assert [message.content for message in result["messages"]] == ["0", "1", "2"]
+    assert len(set(runs.run_ids)) == 3
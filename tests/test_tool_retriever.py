@@ -0,0 +1,117 @@
+import hashlib
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.agent.tools import tool_retriever
+
+
+class HashingEmbeddings(Embeddings):
+    """Bag-of-words vectors, so tests need no embedding model."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(64, dtype=np.float32)
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+@pytest.fixture
+def docs_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(tool_retriever, "FastEmbedEmbeddings", HashingEmbeddings)
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ["a", "b"]:
+        (docs / f"{name}.txt").write_text("\n\n".join(f"{name} paragraph {i} about topic {i * 7 % 13} at the clinic" for i in range(40)))
+    return docs
+
+
+@pytest.mark.parametrize("index_format", ["pickle", "mmap"])
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "ivf_pq"])
+def test_search_after_removing_a_file(docs_dir: Path, tmp_path: Path, index_type: str, index_format: str):
+    options = dict(path_docs=str(docs_dir), index_dir=str(tmp_path / "index"), index_type=index_type, index_format=index_format)
+    tool_retriever.VectorStoreRetriever(**options)
+    (docs_dir / "a.txt").unlink()
+
+    tool_retriever.VectorStoreRetriever(**options)
+    # restart again: the index saved by the sync is loaded
+    retriever = tool_retriever.VectorStoreRetriever(**options)
+
+    assert retriever.vector_store.index.ntotal == len(retriever.vector_store.index_to_docstore_id)
+    docs = retriever.search("b paragraph 3 about topic", k=5)
+    assert docs
+    assert all(doc.page_content.startswith("b paragraph") for doc in docs)
+
+
+def test_open_mmap_index_survives_sync_and_rebuild(docs_dir: Path, tmp_path: Path):
+    options = dict(path_docs=str(docs_dir), index_dir=str(tmp_path / "index"), index_type="flat", index_format="mmap")
+    tool_retriever.VectorStoreRetriever(**options)
+    # another worker process, started before the knowledge base changes
+    reader = tool_retriever.VectorStoreRetriever(**options)
+
+    (docs_dir / "a.txt").unlink()
+    tool_retriever.VectorStoreRetriever(**options)
+    assert reader.search("a paragraph 3 about topic", k=5)
+
+    (docs_dir / "c.txt").write_text("c paragraph about vaccines")
+    writer = tool_retriever.VectorStoreRetriever(**options, chunk_size=200)
+    assert reader.search("a paragraph 4 about topic", k=5)
+    assert writer.search("c paragraph about vaccines", k=1)[0].page_content == "c paragraph about vaccines"
+
+
+@pytest.mark.skipif(not Path("/proc/self/maps").exists(), reason="needs /proc/self/maps")
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_flat"])
+def test_mmap_index_is_backed_by_the_file(docs_dir: Path, tmp_path: Path, index_type: str):
+    options = dict(path_docs=str(docs_dir), index_dir=str(tmp_path / "index"), index_type=index_type, index_format="mmap")
+    tool_retriever.VectorStoreRetriever(**options)
+    retriever = tool_retriever.VectorStoreRetriever(**options)
+
+    index_file = str((tmp_path / "index" / "index.faiss").resolve())
+    assert any(line.rstrip().endswith(index_file) for line in Path("/proc/self/maps").read_text().splitlines())
+    assert retriever.search("b paragraph 3 about topic", k=5)
+
+
+def test_mmap_keyword_search_reads_only_returned_chunks(docs_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(tool_retriever.settings, "KB_HYBRID", True)
+    options = dict(path_docs=str(docs_dir), index_dir=str(tmp_path / "index"), index_type="flat", index_format="mmap")
+    tool_retriever.VectorStoreRetriever(**options)
+    retriever = tool_retriever.VectorStoreRetriever(**options)
+
+    docstore = retriever.vector_store.docstore
+    reads: List[str] = []
+    monkeypatch.setattr(docstore, "search", lambda doc_id: reads.append(doc_id) or type(docstore).search(docstore, doc_id))
+    docs = retriever.search("b paragraph 3 about topic 8", k=5)
+
+    assert docs and all(doc.page_content.startswith("b paragraph") for doc in docs)
+    assert len(reads) <= tool_retriever.settings.KB_CANDIDATES
+    assert len(retriever._bm25) == 0
+
+
+@pytest.mark.parametrize("index_format", ["pickle", "mmap"])
+def test_too_small_corpus_is_not_rebuilt_on_every_start(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, index_format: str):
+    monkeypatch.setattr(tool_retriever, "FastEmbedEmbeddings", HashingEmbeddings)
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("BPJS patients register at the front desk")
+    options = dict(path_docs=str(docs), index_dir=str(tmp_path / "index"), index_type="ivf_flat", index_format=index_format)
+    tool_retriever.VectorStoreRetriever(**options)
+
+    rebuilds: List[int] = []
+    rebuild = tool_retriever.VectorStoreRetriever.rebuild
+    monkeypatch.setattr(tool_retriever.VectorStoreRetriever, "rebuild", lambda self: rebuilds.append(1) or rebuild(self))
+    retriever = tool_retriever.VectorStoreRetriever(**options)
+
+    assert rebuilds == []
+    assert retriever.search("BPJS", k=1)[0].page_content == "BPJS patients register at the front desk"